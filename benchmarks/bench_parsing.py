@@ -0,0 +1,69 @@
+"""
+Throughput of the history/log parsers in nflog.parsing, in lines per second.
+
+    python benchmarks/bench_parsing.py [lines]
+
+Synthetic inputs mimic real files: log lines arrive in time order with many lines per
+second, history rows have distinct timestamps and a mix of duration formats. The
+``strptime`` rows show the per-line cost the fast paths replace.
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from nflog.parsing import parse_duration, parse_history_timestamp, parse_log_timestamp
+
+
+def log_lines(count: int) -> List[str]:
+    start = datetime(2024, 12, 31, 22, 0, 0)
+    return [
+        f"{(start + timedelta(milliseconds=37 * index)).strftime('%b-%d %H:%M:%S.%f')[:19]} [Task monitor] DEBUG n.processor.TaskPollingMonitor - !! executor local > tasks to be completed: 4"
+        for index in range(count)
+    ]
+
+
+def history_stamps(count: int) -> List[str]:
+    start = datetime(2023, 1, 1)
+    return [(start + timedelta(minutes=17 * index)).strftime("%Y-%m-%d %H:%M:%S") for index in range(count)]
+
+
+def durations(count: int) -> List[str]:
+    rng = random.Random(1)
+    shapes = [
+        lambda: f"{rng.randint(1, 59)}.{rng.randint(0, 9)}s",
+        lambda: f"{rng.randint(1, 59)}m {rng.randint(0, 59)}s",
+        lambda: f"{rng.randint(1, 23)}h {rng.randint(0, 59)}m {rng.randint(0, 59)}s",
+        lambda: f"{rng.randint(1, 3)}d {rng.randint(0, 23)}h",
+        lambda: f"{rng.randint(1, 999)}ms",
+        lambda: "-",
+    ]
+    return [rng.choice(shapes)() for _ in range(count)]
+
+
+def bench(label: str, lines: List[str], parse: Callable[[str], object]) -> None:
+    started = time.perf_counter()
+    for line in lines:
+        parse(line)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {len(lines) / elapsed:>14,.0f} lines/s")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    reference = datetime(2025, 1, 1, 1, 0, 0)
+    logs = log_lines(count)
+    stamps = history_stamps(count)
+    print(f"{count:,} lines per input")
+    bench("log timestamps (nflog.parsing)", logs, lambda line: parse_log_timestamp(line, reference))
+    bench("log timestamps (strptime)", logs, lambda line: datetime.strptime(f"2024 {line[:19]}", "%Y %b-%d %H:%M:%S.%f"))
+    bench("history timestamps (nflog.parsing)", stamps, parse_history_timestamp)
+    bench("history timestamps (strptime)", stamps, lambda line: datetime.strptime(line, "%Y-%m-%d %H:%M:%S"))
+    bench("durations (nflog.parsing)", durations(count), parse_duration)
+
+
+if __name__ == "__main__":
+    main()
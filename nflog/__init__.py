@@ -1,18 +1,40 @@
 """
 nflog exposes helpers to inspect Nextflow runs from local artifacts.
 """
-from .models import ErrorItem, RunDetails, RunStatus, RunSummary
+from .models import ErrorItem, FailureHistory, GrepMatch, ResumeReport, ResumeStep, RunDetails, RunStatus, RunSummary, Straggler, TaskRecord, Timeline
 from .discovery import get_run, list_runs
-from .status import get_status
+from .status import estimate_status, get_status, get_statuses
 from .errors import get_errors
+from .search import grep_run
+from .tasks import iter_tasks
+from .export import export_tasks, tasks_frame
+from .timeline import get_timeline
+from .stragglers import find_stragglers
+from .resume import resume_report
 
 __all__ = [
     "ErrorItem",
+    "FailureHistory",
+    "GrepMatch",
+    "ResumeReport",
+    "ResumeStep",
     "RunDetails",
     "RunStatus",
     "RunSummary",
+    "Straggler",
+    "TaskRecord",
+    "Timeline",
+    "estimate_status",
+    "export_tasks",
+    "find_stragglers",
     "get_errors",
     "get_run",
     "get_status",
+    "get_statuses",
+    "get_timeline",
+    "grep_run",
+    "iter_tasks",
     "list_runs",
+    "resume_report",
+    "tasks_frame",
 ]
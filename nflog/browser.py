@@ -0,0 +1,245 @@
+"""
+Interactive pager over a run's failures.
+
+Failures are pulled from ``iter_failures`` only as far as the current page needs, so the
+first screen appears after the first few matches even on runs with thousands of failed
+tasks. Excerpts and file contents are read only for the selected failure and kept in an
+LRU cache; filters by process or exit code apply to what was already scanned and resume
+the same scan when a page needs more rows.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from rich.console import Console
+from rich.markup import escape
+from rich.panel import Panel
+from rich.table import Table
+
+from .errors import iter_failures
+from .models import RunDetails
+from .utils import read_process_name, tail_text
+
+LOG = logging.getLogger("nflog")
+
+DEFAULT_PAGE_SIZE = 15
+DEFAULT_CACHE_SIZE = 64
+EXCERPT_LINES = 12
+MAX_VIEW_BYTES = 64 * 1024
+
+KEY_UP = {"k", "\x1b[A", "\x1bOA"}
+KEY_DOWN = {"j", "\x1b[B", "\x1bOB"}
+KEY_NEXT_PAGE = {"n", " ", "\x1b[6~"}
+KEY_PREV_PAGE = {"p", "\x1b[5~"}
+KEY_ENTER = {"\r", "\n"}
+KEY_QUIT = {"q", "\x1b", "\x03"}
+HELP = "j/k move  n/p page  enter view files  / process  e exit code  c clear  q quit"
+
+
+@dataclass
+class Failure:
+    task_dir: Path
+    exit_code: Optional[int]
+    note: Optional[str]
+    process_name: Optional[str]
+
+
+class FailureBrowser:
+    """
+    Page through failures with single-key commands read from ``read_key``.
+    """
+
+    def __init__(
+        self,
+        run: RunDetails,
+        console: Console,
+        read_key: Callable[[], str],
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        failures: Optional[Iterator[Tuple[Path, Optional[int], Optional[str]]]] = None,
+    ) -> None:
+        self.run = run
+        self.console = console
+        self.read_key = read_key
+        self.page_size = page_size
+        self.loaded: List[Failure] = []
+        self.exhausted = False
+        self.process: Optional[str] = None
+        self.exit_code: Optional[int] = None
+        self.page = 0
+        self.cursor = 0
+        self.viewing = False
+        self._source = failures if failures is not None else iter_failures(run)
+        self._matches: List[int] = []
+        self._excerpt = lru_cache(maxsize=cache_size)(self._read_excerpt)
+        self._contents = lru_cache(maxsize=cache_size)(self._read_contents)
+
+    def matches(self, count: int) -> List[int]:
+        """
+        Indices into ``loaded`` of the first ``count`` failures passing the filters,
+        scanning further only when fewer are known.
+        """
+        while len(self._matches) < count and not self.exhausted:
+            try:
+                task_dir, exit_code, note = next(self._source)
+            except StopIteration:
+                self.exhausted = True
+                break
+            self.loaded.append(Failure(task_dir, exit_code, note, read_process_name(task_dir / ".command.run")))
+            if self._accepts(self.loaded[-1]):
+                self._matches.append(len(self.loaded) - 1)
+        return self._matches[:count]
+
+    def set_filter(self, process: Optional[str] = None, exit_code: Optional[int] = None) -> None:
+        self.process = process
+        self.exit_code = exit_code
+        self._matches = [index for index, failure in enumerate(self.loaded) if self._accepts(failure)]
+        self.page = self.cursor = 0
+
+    def current_page(self) -> List[Failure]:
+        start = self.page * self.page_size
+        return [self.loaded[index] for index in self.matches(start + self.page_size)[start:]]
+
+    def selected(self) -> Optional[Failure]:
+        rows = self.current_page()
+        return rows[self.cursor] if self.cursor < len(rows) else None
+
+    def loop(self) -> None:
+        while True:
+            self.render()
+            key = self.read_key()
+            if key in KEY_QUIT:
+                if self.viewing:
+                    self.viewing = False
+                    continue
+                return
+            self.handle(key)
+
+    def handle(self, key: str) -> None:
+        if self.viewing:
+            self.viewing = False
+            return
+        rows = self.current_page()
+        if key in KEY_ENTER:
+            self.viewing = bool(rows)
+        elif key in KEY_DOWN:
+            if self.cursor + 1 < len(rows):
+                self.cursor += 1
+            elif self._has_page(self.page + 1):
+                self.page, self.cursor = self.page + 1, 0
+        elif key in KEY_UP:
+            if self.cursor > 0:
+                self.cursor -= 1
+            elif self.page > 0:
+                self.page, self.cursor = self.page - 1, self.page_size - 1
+        elif key in KEY_NEXT_PAGE:
+            if self._has_page(self.page + 1):
+                self.page, self.cursor = self.page + 1, 0
+        elif key in KEY_PREV_PAGE:
+            if self.page > 0:
+                self.page, self.cursor = self.page - 1, 0
+        elif key == "/":
+            self.set_filter(process=self._read_line("Process: ") or None, exit_code=self.exit_code)
+        elif key == "e":
+            raw = self._read_line("Exit code: ")
+            try:
+                self.set_filter(process=self.process, exit_code=int(raw) if raw else None)
+            except ValueError:
+                LOG.debug("Ignoring exit code filter %r", raw)
+        elif key == "c":
+            self.set_filter()
+
+    def render(self) -> None:
+        self.console.clear()
+        rows = self.current_page()
+        if self.viewing and rows:
+            self._render_files(rows[self.cursor])
+            return
+        start = self.page * self.page_size
+        total = f"{len(self._matches)}" if self.exhausted else f"{len(self._matches)}+"
+        filters = ", ".join(
+            text
+            for text in (
+                f"process={self.process}" if self.process else "",
+                f"exit={self.exit_code}" if self.exit_code is not None else "",
+            )
+            if text
+        )
+        self.console.print(f"🪵 [bold red]Failed tasks for {self.run.run_id}[/bold red] {escape(filters)}")
+        table = Table(header_style="bold blue", box=None)
+        table.add_column("#")
+        table.add_column("Process")
+        table.add_column("Exit")
+        table.add_column("Work dir")
+        for offset, failure in enumerate(rows):
+            table.add_row(
+                str(start + offset + 1),
+                escape(failure.process_name or "-"),
+                str(failure.exit_code) if failure.exit_code is not None else "-",
+                escape(str(failure.task_dir)),
+                style="reverse" if offset == self.cursor else None,
+            )
+        self.console.print(table)
+        if not rows:
+            self.console.print("No failing tasks match." if self.exhausted else "Scanning...")
+        else:
+            self.console.print(f"{start + 1}-{start + len(rows)} of {total}")
+            excerpt = self._excerpt(rows[self.cursor].task_dir)
+            self.console.print(Panel(escape(excerpt or "(no .command.err/.command.log output)"), title="tail", title_align="left"))
+        self.console.print(f"[grey70]{HELP}[/grey70]")
+
+    def _render_files(self, failure: Failure) -> None:
+        self.console.print(f"🪵 [bold red]{escape(failure.process_name or '-')}[/bold red] {escape(str(failure.task_dir))}")
+        if failure.note:
+            self.console.print(escape(failure.note))
+        for name, content in self._contents(failure.task_dir):
+            self.console.print(Panel(escape(content), title=name, title_align="left"))
+        self.console.print("[grey70]any key back[/grey70]")
+
+    def _accepts(self, failure: Failure) -> bool:
+        if self.process is not None and failure.process_name != self.process:
+            return False
+        if self.exit_code is not None and failure.exit_code != self.exit_code:
+            return False
+        return True
+
+    def _has_page(self, page: int) -> bool:
+        return len(self.matches(page * self.page_size + 1)) > page * self.page_size
+
+    def _read_line(self, prompt: str) -> str:
+        self.console.print(prompt, end="")
+        chars: List[str] = []
+        while True:
+            key = self.read_key()
+            if key in KEY_ENTER:
+                return "".join(chars).strip()
+            if key in {"\x7f", "\b"}:
+                if chars:
+                    chars.pop()
+            elif key in KEY_QUIT - {"q"}:
+                return ""
+            else:
+                chars.append(key)
+
+    @staticmethod
+    def _read_excerpt(task_dir: Path) -> str:
+        excerpt = tail_text(task_dir / ".command.err", max_lines=EXCERPT_LINES).strip()
+        return excerpt or tail_text(task_dir / ".command.log", max_lines=EXCERPT_LINES).strip()
+
+    @staticmethod
+    def _read_contents(task_dir: Path) -> List[Tuple[str, str]]:
+        files = []
+        for name, keep_head in ((".command.err", False), (".command.sh", True)):
+            try:
+                data = (task_dir / name).read_bytes()
+            except FileNotFoundError:
+                continue
+            if len(data) > MAX_VIEW_BYTES:
+                data = data[:MAX_VIEW_BYTES] if keep_head else data[-MAX_VIEW_BYTES:]
+                name = f"{name} (truncated to {MAX_VIEW_BYTES // 1024} KiB)"
+            files.append((name, data.decode(errors="replace")))
+        return files
@@ -0,0 +1,379 @@
+"""
+Snapshot bundles: one indexed archive holding what nflog needs to analyze a single run.
+
+A bundle is a zip file with the run's slice of ``.nextflow/history`` and ``.nextflow.log``,
+its cache index when present, and the small marker and log files of its task dirs, stored
+under ``work/<xx>/<hash>/``. Large files are capped (task logs keep their tail, scripts
+and the log slice keep their head). A JSON manifest records the original mtimes, which zip
+entries cannot hold precisely, and the original work dir so absolute paths from the log
+still resolve inside the bundle.
+
+``BundlePath`` implements the subset of ``pathlib.Path`` nflog uses, so every command can
+read a bundle passed as ``--base-dir`` through random-access member lookups. It is not
+``os.PathLike``: code that needs a real file (walking, mmap, pagers, writes) checks
+``is_snapshot`` and uses the ``Path`` API instead. Functions taking either kind of path
+annotate it as ``AnyPath``.
+"""
+from __future__ import annotations
+
+import atexit
+import fnmatch
+import json
+import logging
+import os
+import posixpath
+import threading
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .cache import cache_dir, session_tasks, task_dir_for
+from .models import RunDetails
+from .utils import file_mtime, iter_task_markers, within_window
+
+LOG = logging.getLogger("nflog")
+
+BUNDLE_SUFFIX = ".nflog"
+MANIFEST_NAME = "nflog-bundle.json"
+BUNDLE_VERSION = 1
+TASK_FILES = (
+    ".exitcode",
+    ".command.begin",
+    ".command.run",
+    ".command.sh",
+    ".command.err",
+    ".command.log",
+    ".command.out",
+    ".command.trace",
+)
+# Files whose beginning matters (headers, scripts); everything else keeps its tail.
+HEAD_FILES = {".command.run", ".command.sh", ".nextflow.log"}
+DEFAULT_MAX_FILE_BYTES = 256 * 1024
+DEFAULT_MAX_LOG_BYTES = 32 * 1024 * 1024
+
+AnyPath = Union[Path, "BundlePath"]
+
+
+@dataclass
+class BundleStats:
+    path: Path
+    tasks: int
+    files: int
+    truncated: int
+
+
+def write_bundle(
+    run: RunDetails,
+    output: Path | str,
+    max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+    max_log_bytes: int = DEFAULT_MAX_LOG_BYTES,
+) -> BundleStats:
+    """
+    Pack a run into a single bundle file that ``list_runs``/``get_run`` accept as a base dir.
+    """
+    output = Path(output)
+    base_dir = run.log_path.parent
+    manifest: Dict[str, object] = {
+        "version": BUNDLE_VERSION,
+        "run_id": run.run_id,
+        "base_dir": str(base_dir),
+        "work_dir": str(run.work_dir),
+        "files": {},
+    }
+    files: Dict[str, List[object]] = manifest["files"]  # type: ignore[assignment]
+    truncated = 0
+    tasks = 0
+
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+
+        def add(member: str, data: bytes, mtime: Optional[float], limit: int, keep_head: bool) -> None:
+            nonlocal truncated
+            cut = len(data) > limit
+            if cut:
+                data = data[:limit] if keep_head else data[-limit:]
+                truncated += 1
+            archive.writestr(member, data)
+            files[member] = [mtime, cut]
+
+        history_path = base_dir / ".nextflow" / "history"
+        if history_path.exists():
+            lines = [
+                line
+                for line in history_path.read_bytes().splitlines(keepends=True)
+                if len(line.split(b"\t")) > 5 and line.split(b"\t")[5].strip() == run.run_id.encode()
+            ]
+            add(".nextflow/history", b"".join(lines), _mtime(history_path), max_log_bytes, keep_head=True)
+        if run.log_path.exists():
+            add(".nextflow.log", _log_slice(run.log_path.read_bytes(), run.run_id), _mtime(run.log_path), max_log_bytes, keep_head=True)
+        if run.run_name:
+            index_path = cache_dir(run) / f"index.{run.run_name}"
+            if index_path.exists():
+                member = f".nextflow/cache/{run.run_id}/{index_path.name}"
+                add(member, index_path.read_bytes(), _mtime(index_path), max_log_bytes, keep_head=True)
+
+        for task_dir in _run_task_dirs(run):
+            try:
+                relative = task_dir.relative_to(run.work_dir).as_posix()
+            except ValueError:
+                continue
+            tasks += 1
+            for name in TASK_FILES:
+                path = task_dir / name
+                try:
+                    data = path.read_bytes()
+                except (FileNotFoundError, IsADirectoryError):
+                    continue
+                add(f"work/{relative}/{name}", data, _mtime(path), max_file_bytes, keep_head=name in HEAD_FILES)
+
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest))
+    return BundleStats(path=output, tasks=tasks, files=len(files), truncated=truncated)
+
+
+def is_bundle(path: Path) -> bool:
+    return path.is_file() and zipfile.is_zipfile(path)
+
+
+def is_snapshot(path: object) -> bool:
+    """
+    Whether ``path`` has no file on disk behind it (a bundle member), so it cannot be
+    walked with os, memory-mapped, handed to another program or written next to.
+    """
+    return not isinstance(path, os.PathLike)
+
+
+def project_root(base_dir: Path | str | BundlePath) -> Path | BundlePath:
+    """
+    Resolve a --base-dir value: a project directory stays a Path, a bundle file is opened.
+    """
+    if isinstance(base_dir, BundlePath):
+        return base_dir
+    path = Path(base_dir)
+    if is_bundle(path):
+        return open_bundle(path)
+    return path
+
+
+def open_bundle(path: Path | str) -> BundlePath:
+    archive = BundleArchive(Path(path))
+    # Members are read lazily for as long as the process runs; close the zip on exit.
+    atexit.register(archive.close)
+    return archive.root
+
+
+class BundleArchive:
+    """
+    Open bundle with an in-memory index of its members, their mtimes and directories.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._lock = threading.Lock()
+        try:
+            manifest = json.loads(self._zip.read(MANIFEST_NAME))
+        except KeyError as exc:
+            self.close()
+            raise RuntimeError(f"{path} is not an nflog bundle (missing {MANIFEST_NAME}).") from exc
+        if manifest.get("version") != BUNDLE_VERSION:
+            self.close()
+            raise RuntimeError(f"Unsupported nflog bundle version {manifest.get('version')} in {path}.")
+        self.run_id: str = manifest["run_id"]
+        self.work_dir: str = manifest["work_dir"]
+        self.base_dir: str = manifest["base_dir"]
+        self.mtime = path.stat().st_mtime
+        self.files: Dict[str, Tuple[Optional[float], int]] = {}
+        self.children: Dict[str, Set[str]] = {"": set()}
+        self.by_name: Dict[str, List[str]] = {}
+        for info in self._zip.infolist():
+            if info.filename == MANIFEST_NAME:
+                continue
+            mtime, _ = manifest["files"].get(info.filename, [None, False])
+            self.files[info.filename] = (mtime, info.file_size)
+            self.by_name.setdefault(posixpath.basename(info.filename), []).append(info.filename)
+            member = info.filename
+            while member:
+                parent = posixpath.dirname(member)
+                siblings = self.children.setdefault(parent, set())
+                name = posixpath.basename(member)
+                if name in siblings:
+                    break
+                siblings.add(name)
+                member = parent
+        self.root = BundlePath(self, "")
+
+    def __enter__(self) -> "BundleArchive":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._zip.close()
+
+    def read(self, member: str) -> bytes:
+        if member not in self.files:
+            raise FileNotFoundError(f"{self.path}/{member}")
+        with self._lock:
+            return self._zip.read(member)
+
+    def locate(self, absolute: str) -> "BundlePath":
+        """
+        Map an absolute path recorded in the bundled log onto bundle members.
+        """
+        absolute = posixpath.normpath(absolute)
+        for original, member in ((self.work_dir, "work"), (self.base_dir, "")):
+            original = posixpath.normpath(original)
+            if absolute == original:
+                return BundlePath(self, member)
+            if absolute.startswith(original + "/"):
+                return BundlePath(self, posixpath.join(member, absolute[len(original) + 1 :]))
+        return BundlePath(self, absolute.lstrip("/"), missing=True)
+
+
+class BundleStat:
+    def __init__(self, mtime: float, size: int) -> None:
+        self.st_mtime = mtime
+        self.st_size = size
+
+
+class BundlePath:
+    """
+    Read-only path inside a bundle mirroring the ``pathlib.Path`` calls nflog makes.
+    """
+
+    __slots__ = ("_archive", "_member", "_missing")
+
+    def __init__(self, archive: BundleArchive, member: str, missing: bool = False) -> None:
+        self._archive = archive
+        self._member = member
+        self._missing = missing
+
+    def __truediv__(self, other: object) -> "BundlePath":
+        return self.joinpath(str(other))
+
+    def joinpath(self, *parts: str) -> "BundlePath":
+        path = self
+        for part in parts:
+            if part.startswith("/"):
+                path = self._archive.locate(part)
+                continue
+            member = posixpath.normpath(posixpath.join(path._member, part))
+            path = BundlePath(self._archive, "" if member == "." else member, path._missing)
+        return path
+
+    @property
+    def name(self) -> str:
+        return posixpath.basename(self._member)
+
+    @property
+    def suffix(self) -> str:
+        return posixpath.splitext(self.name)[1]
+
+    @property
+    def parent(self) -> "BundlePath":
+        return BundlePath(self._archive, posixpath.dirname(self._member), self._missing)
+
+    def relative_to(self, other: "BundlePath") -> Path:
+        prefix = other._member
+        if prefix and not (self._member == prefix or self._member.startswith(prefix + "/")):
+            raise ValueError(f"{self} is not in {other}")
+        return Path(posixpath.relpath(self._member, prefix or "."))
+
+    def exists(self) -> bool:
+        return self.is_file() or self.is_dir()
+
+    def is_file(self) -> bool:
+        return not self._missing and self._member in self._archive.files
+
+    def is_dir(self) -> bool:
+        return not self._missing and self._member in self._archive.children
+
+    def stat(self) -> BundleStat:
+        if self.is_file():
+            mtime, size = self._archive.files[self._member]
+            return BundleStat(mtime if mtime is not None else self._archive.mtime, size)
+        if self.is_dir():
+            return BundleStat(self._archive.mtime, 0)
+        raise FileNotFoundError(str(self))
+
+    def read_bytes(self) -> bytes:
+        if self._missing:
+            raise FileNotFoundError(str(self))
+        return self._archive.read(self._member)
+
+    def read_text(self, encoding: str = "utf-8", errors: Optional[str] = None) -> str:
+        return self.read_bytes().decode(encoding, errors or "strict")
+
+    def iterdir(self) -> Iterator["BundlePath"]:
+        if not self.is_dir():
+            raise FileNotFoundError(str(self))
+        for child in sorted(self._archive.children[self._member]):
+            yield self / child
+
+    def rglob(self, pattern: str) -> Iterator["BundlePath"]:
+        if self._missing:
+            return
+        prefix = f"{self._member}/" if self._member else ""
+        if any(char in pattern for char in "*?["):
+            candidates = (member for member in self._archive.files if fnmatch.fnmatchcase(posixpath.basename(member), pattern))
+        else:
+            candidates = iter(self._archive.by_name.get(pattern, []))
+        for member in candidates:
+            if member.startswith(prefix):
+                yield BundlePath(self._archive, member)
+
+    def __str__(self) -> str:
+        return f"{self._archive.path}/{self._member}" if self._member else str(self._archive.path)
+
+    def __repr__(self) -> str:
+        return f"BundlePath({str(self)!r})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, BundlePath) and other._archive is self._archive and other._member == self._member
+
+    def __hash__(self) -> int:
+        return hash((id(self._archive), self._member))
+
+    def __lt__(self, other: "BundlePath") -> bool:
+        return self._member < other._member
+
+
+def _run_task_dirs(run: RunDetails) -> Iterator[Path]:
+    entries = session_tasks(run)
+    if entries is not None:
+        for entry in entries:
+            task_dir = task_dir_for(run.work_dir, entry.task_hash)
+            if task_dir.exists():
+                yield task_dir
+        return
+    for task_dir, finished in iter_task_markers(run.work_dir):
+        marker = task_dir / (".exitcode" if finished else ".command.run")
+        if within_window(file_mtime(marker), run.started, run.ended):
+            yield task_dir
+
+
+def _log_slice(data: bytes, run_id: str) -> bytes:
+    """
+    The part of .nextflow.log belonging to one session: from the launcher line preceding its
+    'Session UUID' line up to the next launcher line. The whole log is kept if the session
+    is not mentioned.
+    """
+    marker = f"Session UUID: {run_id}".encode()
+    found = data.find(marker)
+    if found == -1:
+        return data
+    launcher = b"$> nextflow"
+    start = data.rfind(launcher, 0, found)
+    start = data.rfind(b"\n", 0, start) + 1 if start != -1 else data.rfind(b"\n", 0, found) + 1
+    end = data.find(launcher, found)
+    end = data.rfind(b"\n", 0, end) + 1 if end != -1 else len(data)
+    return data[start:end]
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,240 @@
+"""
+Read-only access to Nextflow's per-session cache under ``.nextflow/cache/<session-uuid>``.
+
+Each session directory holds ``index.<runName>`` files (one 16-byte task hash plus a cached
+flag per task, in completion order) and a LevelDB database ``db`` keyed by task hash. The
+LevelDB reader below only understands what is needed to list live keys: write-ahead log
+files and sorted tables with no or Snappy block compression. Checksums are not verified.
+"""
+from __future__ import annotations
+
+import logging
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .models import CacheEntry, RunDetails
+
+LOG = logging.getLogger("nflog")
+
+HASH_SIZE = 16
+TABLE_MAGIC = 0xDB4775248B80FB57
+FOOTER_SIZE = 48
+LOG_BLOCK_SIZE = 32768
+LOG_HEADER_SIZE = 7
+LOG_FULL, LOG_FIRST, LOG_MIDDLE, LOG_LAST = 1, 2, 3, 4
+VALUE_DELETION, VALUE_PUT = 0, 1
+
+
+def cache_dir(run: RunDetails) -> Path:
+    return run.log_path.parent / ".nextflow" / "cache" / run.run_id
+
+
+def task_dir_for(work_dir: Path, task_hash: str) -> Path:
+    return work_dir / task_hash[:2] / task_hash[2:]
+
+
+def session_tasks(run: RunDetails) -> Optional[List[CacheEntry]]:
+    """
+    Tasks recorded for the run in the Nextflow cache, or None when there is no usable cache.
+
+    The run's own ``index.<runName>`` is preferred since it carries the cached flag; otherwise
+    the keys of the session database are used and ``cached`` is left unknown.
+    """
+    directory = cache_dir(run)
+    if not directory.exists():
+        return None
+    try:
+        index_path = _index_path(directory, run.run_name)
+        if index_path is not None:
+            return [CacheEntry(task_hash=key, cached=cached) for key, cached in read_cache_index(index_path)]
+        db_dir = directory / "db"
+        if db_dir.exists():
+            return [CacheEntry(task_hash=key.hex(), cached=None) for key in read_leveldb(db_dir, with_values=False)]
+    except (OSError, ValueError) as exc:
+        LOG.debug("Unable to read Nextflow cache %s: %s", directory, exc)
+    return None
+
+
+def read_cache_index(path: Path) -> Iterator[Tuple[str, bool]]:
+    data = path.read_bytes()
+    record = HASH_SIZE + 1
+    for offset in range(0, len(data) - record + 1, record):
+        yield data[offset : offset + HASH_SIZE].hex(), data[offset + HASH_SIZE] == 1
+
+
+def read_leveldb(db_dir: Path, with_values: bool = True) -> Dict[bytes, bytes]:
+    """
+    Return the live key/value pairs of a LevelDB directory.
+
+    Every table and log file present is read and, for each user key, the entry with the
+    highest sequence number wins; deletions drop the key.
+    """
+    latest: Dict[bytes, Tuple[int, int, bytes]] = {}
+
+    def offer(key: bytes, sequence: int, kind: int, value: bytes) -> None:
+        current = latest.get(key)
+        if current is None or sequence > current[0]:
+            latest[key] = (sequence, kind, value if with_values else b"")
+
+    for path in sorted(db_dir.iterdir(), key=lambda p: p.name):
+        if path.suffix in {".ldb", ".sst"}:
+            for internal_key, value in _iter_table(path.read_bytes()):
+                tag = int.from_bytes(internal_key[-8:], "little")
+                offer(internal_key[:-8], tag >> 8, tag & 0xFF, value)
+        elif path.suffix == ".log":
+            for sequence, kind, key, value in _iter_log(path.read_bytes()):
+                offer(key, sequence, kind, value)
+    return {key: value for key, (_, kind, value) in latest.items() if kind == VALUE_PUT}
+
+
+def snappy_decompress(data: bytes) -> bytes:
+    expected, pos = _varint(data, 0)
+    out = bytearray()
+    while pos < len(data):
+        tag = data[pos]
+        pos += 1
+        kind = tag & 3
+        if kind == 0:
+            size = tag >> 2
+            if size >= 60:
+                extra = size - 59
+                size = int.from_bytes(data[pos : pos + extra], "little")
+                pos += extra
+            size += 1
+            out += data[pos : pos + size]
+            pos += size
+            continue
+        if kind == 1:
+            size = ((tag >> 2) & 7) + 4
+            offset = ((tag >> 5) << 8) | data[pos]
+            pos += 1
+        elif kind == 2:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos : pos + 2], "little")
+            pos += 2
+        else:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos : pos + 4], "little")
+            pos += 4
+        if offset == 0 or offset > len(out):
+            raise ValueError("Corrupt snappy block: bad copy offset")
+        pattern = out[len(out) - offset :]
+        if size <= offset:
+            out += pattern[:size]
+        else:
+            out += (pattern * (size // offset + 1))[:size]
+    if len(out) != expected:
+        raise ValueError("Corrupt snappy block: length mismatch")
+    return bytes(out)
+
+
+def _index_path(directory: Path, run_name: Optional[str]) -> Optional[Path]:
+    if run_name:
+        candidate = directory / f"index.{run_name}"
+        return candidate if candidate.exists() else None
+    indexes = [path for path in directory.iterdir() if path.name.startswith("index.")]
+    return indexes[0] if len(indexes) == 1 else None
+
+
+def _varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated varint")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_log(data: bytes) -> Iterator[Tuple[int, int, bytes, bytes]]:
+    for batch in _log_records(data):
+        if len(batch) < 12:
+            continue
+        sequence, count = struct.unpack_from("<QI", batch, 0)
+        pos = 12
+        for index in range(count):
+            kind = batch[pos]
+            pos += 1
+            size, pos = _varint(batch, pos)
+            key = batch[pos : pos + size]
+            pos += size
+            value = b""
+            if kind == VALUE_PUT:
+                size, pos = _varint(batch, pos)
+                value = batch[pos : pos + size]
+                pos += size
+            yield sequence + index, kind, key, value
+
+
+def _log_records(data: bytes) -> Iterator[bytes]:
+    pending: Optional[bytearray] = None
+    pos = 0
+    while pos + LOG_HEADER_SIZE <= len(data):
+        left_in_block = LOG_BLOCK_SIZE - pos % LOG_BLOCK_SIZE
+        if left_in_block < LOG_HEADER_SIZE:
+            pos += left_in_block
+            continue
+        length, kind = struct.unpack_from("<HB", data, pos + 4)
+        payload = data[pos + LOG_HEADER_SIZE : pos + LOG_HEADER_SIZE + length]
+        pos += LOG_HEADER_SIZE + length
+        if kind == LOG_FULL:
+            pending = None
+            yield payload
+        elif kind == LOG_FIRST:
+            pending = bytearray(payload)
+        elif kind == LOG_MIDDLE and pending is not None:
+            pending += payload
+        elif kind == LOG_LAST and pending is not None:
+            pending += payload
+            yield bytes(pending)
+            pending = None
+        elif kind == 0 and length == 0:
+            # Preallocated zero padding at the tail of the block.
+            pos += left_in_block - LOG_HEADER_SIZE
+            pending = None
+
+
+def _iter_table(data: bytes) -> Iterator[Tuple[bytes, bytes]]:
+    if len(data) < FOOTER_SIZE:
+        raise ValueError("Table file too small")
+    footer = data[-FOOTER_SIZE:]
+    if int.from_bytes(footer[-8:], "little") != TABLE_MAGIC:
+        raise ValueError("Not a LevelDB table")
+    _, pos = _varint(footer, 0)
+    _, pos = _varint(footer, pos)
+    index_offset, pos = _varint(footer, pos)
+    index_size, pos = _varint(footer, pos)
+    for _, handle in _iter_block(_read_block(data, index_offset, index_size)):
+        offset, pos = _varint(handle, 0)
+        size, _ = _varint(handle, pos)
+        yield from _iter_block(_read_block(data, offset, size))
+
+
+def _read_block(data: bytes, offset: int, size: int) -> bytes:
+    block = data[offset : offset + size]
+    compression = data[offset + size]
+    if compression == 0:
+        return block
+    if compression == 1:
+        return snappy_decompress(block)
+    raise ValueError(f"Unsupported LevelDB block compression {compression}")
+
+
+def _iter_block(block: bytes) -> Iterator[Tuple[bytes, bytes]]:
+    restarts = int.from_bytes(block[-4:], "little")
+    limit = len(block) - 4 - 4 * restarts
+    key = b""
+    pos = 0
+    while pos < limit:
+        shared, pos = _varint(block, pos)
+        unshared, pos = _varint(block, pos)
+        value_size, pos = _varint(block, pos)
+        key = key[:shared] + block[pos : pos + unshared]
+        pos += unshared
+        yield key, block[pos : pos + value_size]
+        pos += value_size
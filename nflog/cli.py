@@ -2,16 +2,35 @@ from __future__ import annotations
 
 import json
 import logging
+import re
 from dataclasses import asdict
+from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 import click
+from click.core import ParameterSource
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
 
 from . import get_errors, get_run, get_status, list_runs
-from .errors import open_in_pager
+from .browser import FailureBrowser
+from .bundle import DEFAULT_MAX_FILE_BYTES, DEFAULT_MAX_LOG_BYTES, project_root, write_bundle
+from .completion import complete_process, complete_run_id, complete_run_name
+from .discovery import run_details
+from .errors import iter_failures, open_in_pager
+from .export import EXPORT_FORMATS, export_tasks
+from .ledger import ledger_for
+from .models import FailureHistory
+from .report import DEFAULT_BINS, DEFAULT_MAX_EXCERPTS, write_report
+from .resume import resume_report
+from .status import DEFAULT_SAMPLE, estimate_status, get_statuses
+from .search import DEFAULT_GREP_FILES, DEFAULT_MAX_BYTES, GREP_FILES, grep_run
+from .stragglers import DEFAULT_FACTOR, DEFAULT_KEEP, find_stragglers
+from .tasks import run_finished
+from .timeline import bin_curve, get_timeline, sparkline
 
 LOG = logging.getLogger("nflog")
 console = Console()
@@ -37,7 +56,7 @@ def _banner(text: str) -> None:
     console.print(f"🪵 {text}")
 
 
-def _emit_tsv(headers: list[str], rows: list[list[object]]) -> None:
+def _emit_tsv(headers: list[str], rows: Iterable[list[object]]) -> None:
     def _fmt(value: object) -> str:
         if value is None:
             return "-"
@@ -58,30 +77,61 @@ def _print_default_summary(ctx: click.Context) -> None:
 
 
 @click.group(invoke_without_command=True)
-@click.option("--base-dir", default=".", type=click.Path(file_okay=False, dir_okay=True), help="Nextflow project directory.")
+@click.option("--base-dir", default=".", type=click.Path(file_okay=True, dir_okay=True), help="Nextflow project directory or snapshot bundle.")
 @click.option("--debug", is_flag=True, help="Enable debug logging.")
 @click.pass_context
 def cli(ctx: click.Context, base_dir: str, debug: bool) -> None:
     """Inspect and debug recent Nextflow runs."""
     _setup_logging(debug)
-    ctx.obj = {"base_dir": Path(base_dir).resolve()}
+    ctx.obj = {"base_dir": project_root(Path(base_dir).resolve())}
     if ctx.invoked_subcommand is None:
         _print_default_summary(ctx)
 
 
 @cli.command()
 @click.option("--limit", default=10, show_default=True, help="Number of runs to show.")
+@click.option("--offset", default=0, show_default=True, type=click.IntRange(min=0), help="Skip this many matching runs.")
+@click.option("--since", type=click.DateTime(), help="Only runs started at or after this time.")
+@click.option("--until", type=click.DateTime(), help="Only runs started at or before this time.")
+@click.option("--status", "status_filter", type=click.Choice(["success", "fail", "running", "unknown"]), help="Only runs with this status.")
+@click.option("--name", "name_pattern", shell_complete=complete_run_name, help="Only runs whose name matches this glob pattern.")
+@click.option("--with-counts", is_flag=True, help="Add task counts per run (one shared work dir scan).")
 @click.option("--json", "as_json", is_flag=True, help="Output JSON instead of a table.")
 @click.pass_context
 @click.option("--tsv", "as_tsv", is_flag=True, help="Output TSV instead of a table.")
-def runs(ctx: click.Context, limit: int, as_json: bool, as_tsv: bool) -> None:
+def runs(
+    ctx: click.Context,
+    limit: int,
+    offset: int,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    status_filter: Optional[str],
+    name_pattern: Optional[str],
+    with_counts: bool,
+    as_json: bool,
+    as_tsv: bool,
+) -> None:
     """List recent runs."""
     base_dir: Path = ctx.obj["base_dir"]
-    runs = list_runs(base_dir)[:limit]
+    runs = list_runs(
+        base_dir,
+        since=since,
+        until=until,
+        status=status_filter,
+        name=name_pattern,
+        limit=limit,
+        offset=offset,
+    )
     if as_json and as_tsv:
         raise click.UsageError("Use only one of --json or --tsv.")
+    counts = [s.counts for s in get_statuses([run_details(run) for run in runs])] if with_counts else None
+    count_keys = ["succeeded", "failed", "cached", "running"]
     if as_json:
-        click.echo(json.dumps([asdict(r) for r in runs], default=str, indent=2))
+        payload = [asdict(r) for r in runs]
+        if counts is not None:
+            for item, run_counts in zip(payload, counts):
+                item["counts"] = run_counts
+        click.echo(json.dumps(payload, default=str, indent=2))
         return
     if as_tsv:
         rows = [
@@ -93,9 +143,10 @@ def runs(ctx: click.Context, limit: int, as_json: bool, as_tsv: bool) -> None:
                 run.status,
                 run.work_dir,
             ]
-            for run in runs
+            + ([counts[offset][key] for key in count_keys] if counts is not None else [])
+            for offset, run in enumerate(runs)
         ]
-        _emit_tsv(["run_id", "run_name", "started", "duration", "status", "work_dir"], rows)
+        _emit_tsv(["run_id", "run_name", "started", "duration", "status", "work_dir"] + (count_keys if counts is not None else []), rows)
         return
     _banner("[bold cyan]Recent Nextflow runs[/bold cyan]")
     if not runs:
@@ -107,59 +158,104 @@ def runs(ctx: click.Context, limit: int, as_json: bool, as_tsv: bool) -> None:
     table.add_column("Started")
     table.add_column("Duration")
     table.add_column("Status")
+    if counts is not None:
+        for key in count_keys:
+            table.add_column(key.capitalize())
     table.add_column("Work dir")
-    for run in runs:
+    for offset, run in enumerate(runs):
         table.add_row(
             run.run_id,
             run.run_name or "-",
             run.started.isoformat() if run.started else "-",
             str(run.duration) if run.duration else "-",
             _status_style(run.status),
+            *([str(counts[offset][key]) for key in count_keys] if counts is not None else []),
             str(run.work_dir),
         )
     console.print(table)
 
 
 @cli.command()
-@click.option("--run", "run_id", help="Run id or prefix (defaults to most recent).")
+@click.option("--run", "run_id", shell_complete=complete_run_id, help="Run id or prefix (defaults to most recent).")
+@click.option("--approx", is_flag=True, help="Estimate counts from a random sample of work/ prefix dirs.")
+@click.option("--sample", default=DEFAULT_SAMPLE, show_default=True, type=click.FloatRange(min=0, max=1, min_open=True), help="Fraction of prefix dirs to scan (implies --approx).")
+@click.option("--budget", type=click.FloatRange(min=0), help="Keep sampling until this many seconds are spent (implies --approx).")
+@click.option("--seed", type=int, help="Random seed for sampling (implies --approx).")
 @click.option("--json", "as_json", is_flag=True, help="Output JSON.")
 @click.pass_context
 @click.option("--tsv", "as_tsv", is_flag=True, help="Output TSV instead of a table.")
-def status(ctx: click.Context, run_id: Optional[str], as_json: bool, as_tsv: bool) -> None:
+def status(
+    ctx: click.Context,
+    run_id: Optional[str],
+    approx: bool,
+    sample: float,
+    budget: Optional[float],
+    seed: Optional[int],
+    as_json: bool,
+    as_tsv: bool,
+) -> None:
     """Show run status summary."""
     base_dir: Path = ctx.obj["base_dir"]
+    # Sampling options are meaningless for an exact count, so asking for one means --approx.
+    approx = approx or budget is not None or seed is not None or ctx.get_parameter_source("sample") is not ParameterSource.DEFAULT
     run = get_run(run_id, base_dir)
-    status_obj = get_status(run)
+    status_obj = estimate_status(run, sample=sample, budget=budget, seed=seed) if approx else get_status(run)
     if as_json and as_tsv:
         raise click.UsageError("Use only one of --json or --tsv.")
     if as_json:
         click.echo(json.dumps(asdict(status_obj), default=str, indent=2))
         return
+    intervals = status_obj.intervals or {}
     if as_tsv:
+        if status_obj.estimated:
+            rows = (
+                [["Overall", status_obj.overall, "-", "-"]]
+                + [[k, v, *intervals.get(k, ("-", "-"))] for k, v in status_obj.counts.items()]
+                + [["Derived from", status_obj.details_from, "-", "-"]]
+            )
+            _emit_tsv(["metric", "value", "ci95_low", "ci95_high"], rows)
+            return
         rows = [["Overall", status_obj.overall]] + [[k, v] for k, v in status_obj.counts.items()] + [["Derived from", status_obj.details_from]]
         _emit_tsv(["metric", "value"], rows)
         return
-    _banner(f"[bold cyan]Run {run.run_id}[/bold cyan]")
+    _banner(f"[bold cyan]Run {run.run_id}[/bold cyan]" + (" [yellow](estimated)[/yellow]" if status_obj.estimated else ""))
     table = Table(header_style="bold blue", box=None)
     table.add_column("Metric")
     table.add_column("Value")
     table.add_row("Overall", _status_style(status_obj.overall))
     for key, value in status_obj.counts.items():
-        table.add_row(key, str(value))
+        if key in intervals:
+            low, high = intervals[key]
+            table.add_row(key, f"~{value} (95% CI {low}-{high})")
+        else:
+            table.add_row(key, str(value))
     table.add_row("Derived from", status_obj.details_from)
     console.print(table)
 
 
 @cli.command(name="failed")
-@click.option("--run", "run_id", help="Run id or prefix (defaults to most recent).")
+@click.option("--run", "run_id", shell_complete=complete_run_id, help="Run id or prefix (defaults to most recent).")
 @click.argument("index", required=False, type=int)
 @click.option("--show", default=5, show_default=True, help="How many failures to display.")
 @click.option("--index", "index_opt", type=int, help="Pick a specific failure by index (1-based).")
 @click.option("--open", "open_paths", is_flag=True, help="Open error files in $PAGER.")
+@click.option("--browse", is_flag=True, help="Page through all failures interactively.")
+@click.option("--history", "with_history", is_flag=True, help="Show when each failure was first and last seen across sessions.")
 @click.option("--json", "as_json", is_flag=True, help="Output JSON.")
 @click.pass_context
 @click.option("--tsv", "as_tsv", is_flag=True, help="Output TSV instead of a table.")
-def failed(ctx: click.Context, index: Optional[int], run_id: Optional[str], show: int, index_opt: Optional[int], open_paths: bool, as_json: bool, as_tsv: bool) -> None:
+def failed(
+    ctx: click.Context,
+    index: Optional[int],
+    run_id: Optional[str],
+    show: int,
+    index_opt: Optional[int],
+    open_paths: bool,
+    browse: bool,
+    with_history: bool,
+    as_json: bool,
+    as_tsv: bool,
+) -> None:
     """Display failing tasks with .command.err content."""
     base_dir: Path = ctx.obj["base_dir"]
     pick_index = index_opt if index_opt is not None else index
@@ -167,16 +263,37 @@ def failed(ctx: click.Context, index: Optional[int], run_id: Optional[str], show
         raise click.UsageError("Use only one of --json or --tsv.")
     if pick_index is not None and pick_index < 1:
         raise click.UsageError("Index must be 1 or greater.")
+    if browse and (as_json or as_tsv or pick_index is not None):
+        raise click.UsageError("--browse cannot be combined with an index, --json or --tsv.")
     run = get_run(run_id, base_dir)
-    error_items = get_errors(run, limit=pick_index or show)
+    if browse:
+        FailureBrowser(run, console, click.getchar).loop()
+        return
+    limit = pick_index or show
+    ledger = ledger_for(run)
+    # One scan feeds both the ledger and the listing. It only goes past the shown failures
+    # for --history, or to record a finished run once in full.
+    full = ledger is not None and (with_history or run_finished(run)) and not ledger.is_complete(run)
+    failures = list(iter_failures(run) if full else islice(iter_failures(run), limit))
+    if ledger is not None:
+        try:
+            ledger.record(run, failures, partial=not full)
+        except OSError as exc:
+            LOG.debug("Unable to update the failure ledger: %s", exc)
+    error_items = get_errors(run, limit=limit, failures=failures)
+    histories = ledger.lookup(error_items) if with_history and ledger is not None else [None] * len(error_items)
     if pick_index is not None:
         if len(error_items) < pick_index:
             _banner(f"[bold red]Failed tasks for {run.run_id}[/bold red]")
             console.print(f"No failing task found at index {pick_index} for run {run.run_id}")
             return
         pick = error_items[pick_index - 1]
+        history = histories[pick_index - 1]
         if as_json:
-            click.echo(json.dumps([asdict(pick)], default=str, indent=2))
+            payload = asdict(pick)
+            if with_history:
+                payload["history"] = asdict(history) if history else None
+            click.echo(json.dumps([payload], default=str, indent=2))
             return
         if as_tsv:
             tail = (pick.err_excerpt or "").splitlines()[-1] if pick.err_excerpt else ""
@@ -217,27 +334,41 @@ def failed(ctx: click.Context, index: Optional[int], run_id: Optional[str], show
         _banner(f"[bold red]Failure #{pick_index} for {run.run_id} {f'({label})' if label else ''}[/bold red]")
         if target_path:
             click.echo(f"Path: {target_path}")
+        if with_history:
+            click.echo(f"Seen: {_seen_text(history, run.run_id)}")
         if content:
             click.echo(content)
         else:
             console.print("No error file found.")
         return
     if as_json:
-        click.echo(json.dumps([asdict(e) for e in error_items], default=str, indent=2))
+        payloads = [asdict(e) for e in error_items]
+        if with_history:
+            for payload, history in zip(payloads, histories):
+                payload["history"] = asdict(history) if history else None
+        click.echo(json.dumps(payloads, default=str, indent=2))
         return
     if as_tsv:
         rows = []
-        for offset, err in enumerate(error_items, start=1):
+        for offset, (err, history) in enumerate(zip(error_items, histories), start=1):
             tail = (err.err_excerpt or "").splitlines()[-1] if err.err_excerpt else ""
-            rows.append(
-                [
-                    offset,
-                    err.process_name or "-",
-                    err.exit_code if err.exit_code is not None else "-",
-                    tail,
+            row: list[object] = [
+                offset,
+                err.process_name or "-",
+                err.exit_code if err.exit_code is not None else "-",
+                tail,
+            ]
+            if with_history:
+                row += [
+                    history.first_session if history else None,
+                    history.last_session if history else None,
+                    history.sessions if history else 0,
+                    history.launches if history else 0,
+                    history.occurrences if history else 0,
                 ]
-            )
-        _emit_tsv(["index", "process", "exit_code", "tail"], rows)
+            rows.append(row)
+        headers = ["index", "process", "exit_code", "tail"]
+        _emit_tsv(headers + ["first_seen", "last_seen", "sessions", "launches", "occurrences"] if with_history else headers, rows)
         return
     _banner(f"[bold red]Failed tasks for {run.run_id}[/bold red]")
     if not error_items:
@@ -248,14 +379,19 @@ def failed(ctx: click.Context, index: Optional[int], run_id: Optional[str], show
     table.add_column("Process")
     table.add_column("Exit")
     table.add_column(".command.err / .log tail")
+    if with_history:
+        table.add_column("Seen")
     start_index = pick_index or 1
-    for offset, err in enumerate(error_items, start=start_index):
-        table.add_row(
+    for offset, (err, history) in enumerate(zip(error_items, histories), start=start_index):
+        cells = [
             str(offset),
             err.process_name or "-",
             str(err.exit_code) if err.exit_code is not None else "-",
             (err.err_excerpt or "").splitlines()[-1] if err.err_excerpt else "",
-        )
+        ]
+        if with_history:
+            cells.append(_seen_text(history, run.run_id))
+        table.add_row(*cells)
     console.print(table)
     console.print("Inspect .command.sh or rerun with -resume for reproduction guidance.")
     if open_paths:
@@ -265,9 +401,315 @@ def failed(ctx: click.Context, index: Optional[int], run_id: Optional[str], show
         console.print("Pass --open to view .command.err in $PAGER.")
 
 
+def _seen_text(history: Optional[FailureHistory], run_id: str) -> str:
+    if history is None:
+        return "not recorded"
+    if history.launches == 1 and history.first_session == run_id:
+        return "new in this session"
+    first = (history.first_started or history.first_session)[:16]
+    last = (history.last_started or history.last_session)[:16]
+    seen = f"{history.sessions} sessions" + (f", {history.launches} launches" if history.launches > history.sessions else "")
+    return f"{seen} ({history.occurrences} tasks), first {first}, last {last}"
+
+
 cli.add_command(failed, "f")
 
 
+@cli.command(name="grep")
+@click.argument("pattern")
+@click.option("--run", "run_id", shell_complete=complete_run_id, help="Run id or prefix (defaults to most recent).")
+@click.option(
+    "--files",
+    default=",".join(DEFAULT_GREP_FILES),
+    show_default=True,
+    help=f"Comma-separated task files to search ({', '.join(GREP_FILES)}).",
+)
+@click.option("-i", "--ignore-case", is_flag=True, help="Case-insensitive match.")
+@click.option("--max-bytes", default=DEFAULT_MAX_BYTES, show_default=True, type=click.IntRange(min=1), help="Search at most this many bytes of each file.")
+@click.option("--workers", type=click.IntRange(min=1), help="Number of search threads.")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON lines.")
+@click.pass_context
+@click.option("--tsv", "as_tsv", is_flag=True, help="Output TSV instead of a table.")
+def grep(
+    ctx: click.Context,
+    pattern: str,
+    run_id: Optional[str],
+    files: str,
+    ignore_case: bool,
+    max_bytes: int,
+    workers: Optional[int],
+    as_json: bool,
+    as_tsv: bool,
+) -> None:
+    """Search the task logs of a run for PATTERN (a regular expression)."""
+    base_dir: Path = ctx.obj["base_dir"]
+    if as_json and as_tsv:
+        raise click.UsageError("Use only one of --json or --tsv.")
+    run = get_run(run_id, base_dir)
+    keys = [key.strip() for key in files.split(",") if key.strip()]
+    try:
+        matches = grep_run(run, pattern, files=keys, ignore_case=ignore_case, max_bytes=max_bytes, workers=workers)
+        if as_json:
+            for match in matches:
+                click.echo(json.dumps(asdict(match), default=str))
+            return
+        if as_tsv:
+            _emit_tsv(
+                ["hash", "process", "path", "line_number", "line"],
+                ([m.task_hash, m.process_name or "-", m.path, m.line_number, m.line] for m in matches),
+            )
+            return
+        for match in matches:
+            console.print(
+                f"[cyan]\\[{match.task_hash}][/] [bold]{escape(match.process_name or '-')}[/] "
+                f"[grey70]{match.path.name}:{match.line_number}:[/] {escape(match.line)}",
+                highlight=False,
+                soft_wrap=True,
+            )
+    except (ValueError, re.error) as exc:
+        raise click.UsageError(str(exc)) from exc
+
+
+@cli.command(name="export")
+@click.option("--run", "run_id", shell_complete=complete_run_id, help="Run id or prefix (defaults to most recent).")
+@click.option("--format", "fmt", type=click.Choice(EXPORT_FORMATS), default="csv", show_default=True, help="Output format.")
+@click.option("-o", "--output", default="-", show_default=True, help="Output file ('-' writes CSV to stdout).")
+@click.pass_context
+def export(ctx: click.Context, run_id: Optional[str], fmt: str, output: str) -> None:
+    """Export one row per task of a run as CSV, Arrow IPC or Parquet."""
+    base_dir: Path = ctx.obj["base_dir"]
+    run = get_run(run_id, base_dir)
+    try:
+        written = export_tasks(run, output, fmt=fmt)
+    except ValueError as exc:
+        raise click.UsageError(str(exc)) from exc
+    except RuntimeError as exc:
+        raise click.ClickException(str(exc)) from exc
+    if output != "-":
+        click.echo(f"Wrote {written} tasks for {run.run_id} to {output}", err=True)
+
+
+@cli.command(name="timeline")
+@click.option("--run", "run_id", shell_complete=complete_run_id, help="Run id or prefix (defaults to most recent).")
+@click.option("--bins", default=60, show_default=True, type=click.IntRange(min=1), help="Number of time slices.")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON.")
+@click.pass_context
+@click.option("--tsv", "as_tsv", is_flag=True, help="Output TSV instead of a table.")
+def timeline(ctx: click.Context, run_id: Optional[str], bins: int, as_json: bool, as_tsv: bool) -> None:
+    """Show how many tasks were running over time, overall and per process."""
+    base_dir: Path = ctx.obj["base_dir"]
+    if as_json and as_tsv:
+        raise click.UsageError("Use only one of --json or --tsv.")
+    run = get_run(run_id, base_dir)
+    profile = get_timeline(run)
+    binned = bin_curve(profile.curve, bins)
+    if as_json:
+        payload = {
+            "run_id": profile.run_id,
+            "start": profile.start,
+            "end": profile.end,
+            "tasks": profile.tasks,
+            "peak": profile.peak,
+            "mean": profile.mean,
+            "bins": [
+                {"start": datetime.fromtimestamp(ts), "mean": round(mean, 3), "max": peak}
+                for ts, mean, peak in binned
+            ],
+            "processes": profile.processes,
+        }
+        click.echo(json.dumps(payload, default=str, indent=2))
+        return
+    if as_tsv:
+        _emit_tsv(
+            ["bin_start", "mean_running", "max_running"],
+            ([datetime.fromtimestamp(ts).isoformat(), round(mean, 3), peak] for ts, mean, peak in binned),
+        )
+        return
+    _banner(f"[bold cyan]Timeline for {run.run_id}[/bold cyan]")
+    if not profile.tasks:
+        console.print("No task start/end markers found.")
+        return
+    console.print(f"{profile.start.isoformat()} [cyan]{sparkline([mean for _, mean, _ in binned])}[/] {profile.end.isoformat()}", highlight=False)
+    console.print(f"Tasks: {profile.tasks}  Peak running: {profile.peak}  Mean running: {profile.mean:.2f}", highlight=False)
+    table = Table(header_style="bold blue", box=None)
+    table.add_column("Process")
+    table.add_column("Tasks")
+    table.add_column("Busy (h)")
+    table.add_column("Peak")
+    table.add_column("Mean")
+    for name, stats in sorted(profile.processes.items(), key=lambda item: item[1]["busy_seconds"], reverse=True):
+        table.add_row(
+            name,
+            str(stats["tasks"]),
+            f"{stats['busy_seconds'] / 3600:.2f}",
+            str(stats["peak"]),
+            f"{stats['mean']:.2f}",
+        )
+    console.print(table)
+
+
+@cli.command(name="stragglers")
+@click.option("--run", "run_id", shell_complete=complete_run_id, help="Run id or prefix (defaults to most recent).")
+@click.option("--process", "process_name", shell_complete=complete_process, help="Only consider tasks of this process.")
+@click.option("--factor", default=DEFAULT_FACTOR, show_default=True, type=click.FloatRange(min=1), help="Minimum duration as a multiple of the process median.")
+@click.option("--keep", default=DEFAULT_KEEP, show_default=True, type=click.IntRange(min=1), help="Longest tasks tracked per process.")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON.")
+@click.pass_context
+@click.option("--tsv", "as_tsv", is_flag=True, help="Output TSV instead of a table.")
+def stragglers(
+    ctx: click.Context,
+    run_id: Optional[str],
+    process_name: Optional[str],
+    factor: float,
+    keep: int,
+    as_json: bool,
+    as_tsv: bool,
+) -> None:
+    """Find tasks that ran far longer than the rest of their process."""
+    base_dir: Path = ctx.obj["base_dir"]
+    if as_json and as_tsv:
+        raise click.UsageError("Use only one of --json or --tsv.")
+    run = get_run(run_id, base_dir)
+    found = find_stragglers(run, factor=factor, keep=keep, process=process_name)
+    if as_json:
+        click.echo(json.dumps([dict(asdict(item), ratio=round(item.ratio, 2)) for item in found], default=str, indent=2))
+        return
+    if as_tsv:
+        _emit_tsv(
+            ["process", "hash", "status", "duration_s", "median_s", "p95_s", "ratio", "work_dir"],
+            (
+                [s.process_name, s.task_hash, s.status, round(s.duration, 1), round(s.median, 1), round(s.p95, 1), round(s.ratio, 2), s.work_dir]
+                for s in found
+            ),
+        )
+        return
+    _banner(f"[bold yellow]Stragglers for {run.run_id}[/bold yellow]")
+    if not found:
+        console.print(f"No tasks above p95 and {factor:g}x their process median.")
+        return
+    table = Table(header_style="bold blue", box=None)
+    table.add_column("Process")
+    table.add_column("Hash")
+    table.add_column("Duration")
+    table.add_column("Median")
+    table.add_column("p95")
+    table.add_column("x median")
+    table.add_column("Work dir")
+    for item in found:
+        table.add_row(
+            item.process_name,
+            item.task_hash,
+            _fmt_seconds(item.duration) + (" (running)" if item.status == "running" else ""),
+            _fmt_seconds(item.median),
+            _fmt_seconds(item.p95),
+            f"{item.ratio:.1f}",
+            str(item.work_dir),
+        )
+    console.print(table)
+
+
+def _fmt_seconds(seconds: float) -> str:
+    return str(timedelta(seconds=round(seconds)))
+
+
+@cli.command(name="snapshot")
+@click.option("--run", "run_id", shell_complete=complete_run_id, help="Run id or prefix (defaults to most recent).")
+@click.option("-o", "--output", required=True, type=click.Path(dir_okay=False), help="Bundle file to write (e.g. run.nflog).")
+@click.option("--max-file-bytes", default=DEFAULT_MAX_FILE_BYTES, show_default=True, type=click.IntRange(min=1), help="Cap per task file.")
+@click.option("--max-log-bytes", default=DEFAULT_MAX_LOG_BYTES, show_default=True, type=click.IntRange(min=1), help="Cap for the .nextflow.log slice.")
+@click.pass_context
+def snapshot(ctx: click.Context, run_id: Optional[str], output: str, max_file_bytes: int, max_log_bytes: int) -> None:
+    """Pack a run's history, log and task files into one bundle usable as --base-dir."""
+    base_dir: Path = ctx.obj["base_dir"]
+    run = get_run(run_id, base_dir)
+    stats = write_bundle(run, output, max_file_bytes=max_file_bytes, max_log_bytes=max_log_bytes)
+    _banner(f"[bold cyan]Snapshot of {run.run_id}[/bold cyan]")
+    console.print(f"Wrote {stats.tasks} tasks ({stats.files} files, {stats.truncated} truncated) to {stats.path}", highlight=False)
+    console.print(f"Analyze it with: nflog --base-dir {stats.path} status", highlight=False)
+
+
+@cli.command(name="report")
+@click.option("--run", "run_id", shell_complete=complete_run_id, help="Run id or prefix (defaults to most recent).")
+@click.option("-o", "--output", required=True, type=click.Path(dir_okay=False), help="HTML file to write (e.g. report.html).")
+@click.option("--max-excerpts", default=DEFAULT_MAX_EXCERPTS, show_default=True, type=click.IntRange(min=0), help="Failures that get a .command.err excerpt.")
+@click.option("--bins", default=DEFAULT_BINS, show_default=True, type=click.IntRange(min=1), help="Time slices in the timeline.")
+@click.pass_context
+def report(ctx: click.Context, run_id: Optional[str], output: str, max_excerpts: int, bins: int) -> None:
+    """Write a self-contained HTML report of a run from one scan."""
+    base_dir: Path = ctx.obj["base_dir"]
+    run = get_run(run_id, base_dir)
+    stats = write_report(run, output, max_excerpts=max_excerpts, bins=bins)
+    _banner(f"[bold cyan]Report for {run.run_id}[/bold cyan]")
+    console.print(f"Wrote {stats.tasks} tasks ({stats.failures} failures, {stats.size // 1024} KiB) to {stats.path}", highlight=False)
+
+
+@cli.command(name="resume-report")
+@click.option("--run", "run_id", shell_complete=complete_run_id, help="Run id or prefix (defaults to most recent).")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON.")
+@click.pass_context
+@click.option("--tsv", "as_tsv", is_flag=True, help="Output TSV instead of a table.")
+def resume_report_cmd(ctx: click.Context, run_id: Optional[str], as_json: bool, as_tsv: bool) -> None:
+    """Show cached vs. re-executed tasks and compute for each launch of a session."""
+    base_dir: Path = ctx.obj["base_dir"]
+    if as_json and as_tsv:
+        raise click.UsageError("Use only one of --json or --tsv.")
+    report = resume_report(run_id, base_dir)
+    if as_json:
+        click.echo(json.dumps(asdict(report), default=str, indent=2))
+        return
+    if as_tsv:
+        _emit_tsv(
+            ["launch", "run_name", "started", "resumed", "cached", "executed", "failed", "cpu_hours", "untraced", "source"],
+            (
+                [
+                    position,
+                    step.run_name or "-",
+                    step.started.isoformat() if step.started else "-",
+                    "yes" if step.resumed else "no",
+                    step.cached,
+                    step.executed,
+                    step.failed,
+                    step.cpu_hours,
+                    step.untraced,
+                    step.source,
+                ]
+                for position, step in enumerate(report.steps, start=1)
+            ),
+        )
+        return
+    _banner(f"[bold cyan]Resume report for {report.run_id}[/bold cyan]")
+    table = Table(header_style="bold blue", box=None)
+    table.add_column("#")
+    table.add_column("Run name")
+    table.add_column("Started")
+    table.add_column("Cached")
+    table.add_column("Executed")
+    table.add_column("Failed")
+    table.add_column("CPU h")
+    for position, step in enumerate(report.steps, start=1):
+        table.add_row(
+            str(position),
+            (step.run_name or "-") + (" (resumed)" if step.resumed else ""),
+            step.started.isoformat() if step.started else "-",
+            str(step.cached),
+            str(step.executed),
+            str(step.failed),
+            f"{step.cpu_hours:.2f}" + (f" ({step.untraced} untraced)" if step.untraced else ""),
+        )
+    console.print(table)
+    if not report.processes:
+        console.print("No tasks were re-executed by resumed launches.")
+        return
+    console.print(f"Re-executed on resume: [bold]{report.reexecuted_cpu_hours:.2f}[/bold] CPU hours")
+    table = Table(header_style="bold blue", box=None)
+    table.add_column("Process")
+    table.add_column("Re-executed tasks")
+    table.add_column("CPU h")
+    for name, stats in report.processes.items():
+        table.add_row(name, str(stats["tasks"]), f"{stats['cpu_hours']:.2f}")
+    console.print(table)
+
+
 def main() -> None:
     cli(prog_name="nflog")
 
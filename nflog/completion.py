@@ -0,0 +1,99 @@
+"""
+Shell completion for run ids, run names and process names.
+
+Completion runs on every TAB press, so the values come from a small JSON cache under
+``.nextflow/nflog/`` that is rebuilt only when ``.nextflow/history`` or ``.nextflow.log``
+change size or mtime. Rebuilding is one ``list_runs`` call plus one pass over the log.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import click
+from click.shell_completion import CompletionItem
+
+from .bundle import is_snapshot, project_root
+from .discovery import list_runs
+
+LOG = logging.getLogger("nflog")
+
+CACHE_VERSION = 1
+PROCESS_RE = re.compile(r"process > ([^\s(]+)")
+
+
+def completion_cache_path(base_dir: Path) -> Path:
+    return base_dir / ".nextflow" / "nflog" / "completion.json"
+
+
+def completion_values(base_dir: Path | str = ".") -> Dict[str, object]:
+    """
+    Runs (``[run_id, run_name]``, newest first) and process names seen in the log, served
+    from the cache file while the history and log are unchanged.
+    """
+    base = project_root(base_dir)
+    if is_snapshot(base):
+        # Snapshot bundles are read-only and small; build the values directly.
+        return _build_values(base)
+    stamps = {name: _stamp(base / name) for name in (".nextflow/history", ".nextflow.log")}
+    cache_path = completion_cache_path(base)
+    try:
+        cached = json.loads(cache_path.read_text())
+        if cached.get("version") == CACHE_VERSION and cached.get("stamps") == stamps:
+            return cached
+    except (OSError, ValueError):
+        pass
+    values = _build_values(base)
+    values.update(version=CACHE_VERSION, stamps=stamps)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        partial = cache_path.with_name(cache_path.name + ".tmp")
+        partial.write_text(json.dumps(values))
+        os.replace(partial, cache_path)
+    except OSError as exc:
+        LOG.debug("Unable to write %s: %s", cache_path, exc)
+    return values
+
+
+def complete_run_id(ctx: click.Context, param: click.Parameter, incomplete: str) -> List[CompletionItem]:
+    values = completion_values(_base_dir(ctx))
+    return [CompletionItem(run_id, help=run_name) for run_id, run_name in values["runs"] if run_id.startswith(incomplete)]
+
+
+def complete_run_name(ctx: click.Context, param: click.Parameter, incomplete: str) -> List[CompletionItem]:
+    values = completion_values(_base_dir(ctx))
+    names = dict.fromkeys(run_name for _, run_name in values["runs"] if run_name and run_name.startswith(incomplete))
+    return [CompletionItem(name) for name in names]
+
+
+def complete_process(ctx: click.Context, param: click.Parameter, incomplete: str) -> List[CompletionItem]:
+    values = completion_values(_base_dir(ctx))
+    return [CompletionItem(name) for name in values["processes"] if name.startswith(incomplete)]
+
+
+def _base_dir(ctx: click.Context) -> Path:
+    # Group callbacks do not run during completion, so read the raw --base-dir value.
+    return Path(ctx.find_root().params.get("base_dir") or ".").resolve()
+
+
+def _build_values(base: Path) -> Dict[str, object]:
+    runs = [[run.run_id, run.run_name] for run in list_runs(base)]
+    processes = set()
+    log_path = base / ".nextflow.log"
+    if log_path.exists():
+        for line in log_path.read_text(errors="replace").splitlines():
+            if "process > " in line and (match := PROCESS_RE.search(line)):
+                processes.add(match.group(1))
+    return {"runs": runs, "processes": sorted(processes)}
+
+
+def _stamp(path: Path) -> Optional[List[int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
@@ -1,27 +1,58 @@
 from __future__ import annotations
 
+import fnmatch
 import logging
+import mmap
 import re
+from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from .bundle import project_root
 from .models import RunDetails, RunSummary
-from .utils import fallback_run_id, map_status, parse_duration, parse_history_timestamp, parse_log_timestamp
+from .parsing import parse_duration, parse_history_timestamp, parse_log_timestamp
+from .utils import fallback_run_id, file_mtime, map_status, mapped_bytes
 
 LOG = logging.getLogger("nflog")
 
+HISTORY_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+HISTORY_TS_WIDTH = 19
 
-def list_runs(base_dir: Path | str = ".") -> List[RunSummary]:
-    base = Path(base_dir)
-    history_runs = _from_history(base)
-    log_runs = _from_log(base)
-    merged = {}
+
+def list_runs(
+    base_dir: Path | str = ".",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[str] = None,
+    name: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[RunSummary]:
+    """
+    List runs newest first, optionally filtered by start time, status and a glob on the run name.
+
+    Filters apply to each session's newest entry, exactly as the unfiltered listing shows it.
+    History lines before ``since`` are skipped with a binary search over the file bytes. When
+    ``limit`` is set, history is read only until ``offset + limit`` sessions match, and the
+    log is parsed only if it was written after the oldest of them.
+    """
+    base = project_root(base_dir)
+    keep = _run_filter(since, until, status, name)
+    wanted = offset + limit if limit is not None else None
+    history_runs, complete = _from_history(base, since=since, keep=keep, wanted=wanted)
+    log_runs: List[RunSummary] = []
+    if _log_may_rank(base, history_runs, keep, wanted):
+        log_runs = _from_log(base)
+        if not complete:
+            # Log sessions can replace history rows, so the stopping point no longer holds.
+            history_runs, complete = _from_history(base, since=since)
+    merged: Dict[str, RunSummary] = {}
     for run in log_runs + history_runs:
         if run.run_id not in merged or _is_newer(run, merged[run.run_id]):
             merged[run.run_id] = run
-    runs = list(merged.values())
-    runs.sort(key=lambda r: r.started or parse_log_timestamp("Jan-01 00:00:00"), reverse=True)
-    return runs
+    runs = [run for run in merged.values() if keep(run)]
+    runs.sort(key=lambda r: r.started or datetime.min, reverse=True)
+    return runs[offset:wanted]
 
 
 def get_run(run_id: Optional[str] = None, base_dir: Path | str = ".") -> RunDetails:
@@ -32,6 +63,21 @@ def get_run(run_id: Optional[str] = None, base_dir: Path | str = ".") -> RunDeta
         summary = runs[0]
     else:
         summary = _pick_run_by_id(runs, run_id)
+    return run_details(summary)
+
+
+def session_runs(session_id: str, base_dir: Path | str = ".") -> List[RunSummary]:
+    """
+    Every history entry of a session, oldest first. Resumed runs reuse the session id, so
+    this is the chain of launches that share one task cache.
+    """
+    base = project_root(base_dir)
+    runs = [run for run in _history_rows(base) if run.run_id == session_id]
+    runs.sort(key=lambda r: r.started or datetime.min)
+    return runs
+
+
+def run_details(summary: RunSummary) -> RunDetails:
     end_time = summary.started + summary.duration if summary.started and summary.duration else None
     return RunDetails(
         run_id=summary.run_id,
@@ -54,44 +100,134 @@ def _pick_run_by_id(runs: Iterable[RunSummary], run_id: str) -> RunSummary:
     raise RuntimeError(f"Run {run_id} not found.")
 
 
-def _from_history(base_dir: Path) -> List[RunSummary]:
+def _run_filter(
+    since: Optional[datetime],
+    until: Optional[datetime],
+    status: Optional[str],
+    name: Optional[str],
+) -> Callable[[RunSummary], bool]:
+    def keep(run: RunSummary) -> bool:
+        if since is not None and (run.started is None or run.started < since):
+            return False
+        if until is not None and (run.started is None or run.started > until):
+            return False
+        if status is not None and run.status != status:
+            return False
+        if name is not None and not fnmatch.fnmatchcase(run.run_name or "", name):
+            return False
+        return True
+
+    return keep
+
+
+def _bisect_history(buf: bytes | mmap.mmap, key: bytes, right: bool = False) -> int:
+    """
+    Return the offset of the first line whose timestamp column is >= key (> key when right).
+
+    History is appended in time order, so the fixed-width timestamp prefix sorts lexically.
+    """
+    lo, hi = 0, len(buf)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        line_start = buf.rfind(b"\n", lo, mid) + 1 or lo
+        line_end = buf.find(b"\n", line_start)
+        if line_end == -1:
+            line_end = len(buf)
+        stamp = buf[line_start : line_start + HISTORY_TS_WIDTH]
+        if stamp < key or (right and stamp == key):
+            lo = line_end + 1
+        else:
+            hi = line_start
+    return min(lo, len(buf))
+
+
+def _history_lines(history_path: Path, since: Optional[datetime]) -> List[str]:
+    with mapped_bytes(history_path) as buf:
+        start = _bisect_history(buf, since.strftime(HISTORY_TS_FORMAT).encode()) if since else 0
+        return buf[start:].decode(errors="replace").splitlines()
+
+
+def _history_rows(base_dir: Path, since: Optional[datetime] = None) -> Iterator[RunSummary]:
+    """
+    Every history row from ``since`` on, newest first (resumed sessions yield one row per launch).
+    """
     history_path = base_dir / ".nextflow" / "history"
     if not history_path.exists():
-        return []
-    runs: List[RunSummary] = []
-    for line in history_path.read_text(errors="replace").splitlines():
+        return
+    for line in reversed(_history_lines(history_path, since)):
         if not line.strip():
             continue
         parts = line.split("\t", maxsplit=6)
         if len(parts) < 6:
             continue
         timestamp = parse_history_timestamp(parts[0])
-        duration = parse_duration(parts[1])
-        run_name = parts[2] or None
-        status_raw = parts[3] if len(parts) > 3 else ""
         session_id = parts[5] if len(parts) > 5 else ""
-        command = parts[6] if len(parts) > 6 else None
-        run_id = session_id or fallback_run_id(base_dir, timestamp)
-        runs.append(
-            RunSummary(
-                run_id=run_id,
-                run_name=run_name,
-                started=timestamp,
-                duration=duration,
-                status=map_status(status_raw),
-                work_dir=base_dir / "work",
-                log_path=base_dir / ".nextflow.log",
-                source="history",
-                command=command,
-            )
+        yield RunSummary(
+            run_id=session_id or fallback_run_id(base_dir, timestamp),
+            run_name=parts[2] or None,
+            started=timestamp,
+            duration=parse_duration(parts[1]),
+            status=map_status(parts[3] if len(parts) > 3 else ""),
+            work_dir=base_dir / "work",
+            log_path=base_dir / ".nextflow.log",
+            source="history",
+            command=parts[6] if len(parts) > 6 else None,
         )
-    return runs
+
+
+def _from_history(
+    base_dir: Path,
+    since: Optional[datetime] = None,
+    keep: Optional[Callable[[RunSummary], bool]] = None,
+    wanted: Optional[int] = None,
+) -> Tuple[List[RunSummary], bool]:
+    """
+    The newest history row of each session, newest first, and whether history was read to
+    the end. Reading stops once ``wanted`` sessions pass ``keep``.
+
+    Only rows before ``since`` are skipped up front: a session's newest row decides whether
+    it matches, so rows after ``until`` still have to be seen.
+    """
+    runs: List[RunSummary] = []
+    seen = set()
+    matched = 0
+    for run in _history_rows(base_dir, since):
+        if wanted is not None and matched >= wanted:
+            return runs, False
+        if run.run_id in seen:
+            continue
+        seen.add(run.run_id)
+        runs.append(run)
+        if keep is None or keep(run):
+            matched += 1
+    return runs, True
+
+
+def _log_may_rank(
+    base_dir: Path,
+    history_runs: List[RunSummary],
+    keep: Callable[[RunSummary], bool],
+    wanted: Optional[int],
+) -> bool:
+    """
+    Whether the log can change a limited listing: its runs started before its last write,
+    so a log older than every selected history session can neither outrank nor replace them.
+    """
+    written = file_mtime(base_dir / ".nextflow.log")
+    if written is None:
+        return False
+    matched = [run for run in history_runs if keep(run)]
+    if wanted is None or len(matched) < wanted or any(run.started is None for run in matched):
+        return True
+    return written >= min(run.started for run in matched)  # type: ignore[type-var]
 
 
 def _from_log(base_dir: Path) -> List[RunSummary]:
     log_path = base_dir / ".nextflow.log"
     if not log_path.exists():
         return []
+    # Log lines have no year; the log was last written after all of them.
+    reference = file_mtime(log_path)
     runs: List[RunSummary] = []
     current: Optional[RunSummary] = None
     session_re = re.compile(r"Session UUID: ([a-z0-9-]+)", re.IGNORECASE)
@@ -101,7 +237,7 @@ def _from_log(base_dir: Path) -> List[RunSummary]:
 
     for line in log_path.read_text(errors="replace").splitlines():
         if match := session_re.search(line):
-            ts = parse_log_timestamp(line.split("[")[0].strip())
+            ts = parse_log_timestamp(line, reference)
             run_id = match.group(1)
             current = RunSummary(
                 run_id=run_id,
@@ -119,13 +255,13 @@ def _from_log(base_dir: Path) -> List[RunSummary]:
             if not current.run_name and (m := name_re.search(line)):
                 current.run_name = m.group(1)
             if m := work_re.search(line):
-                current.work_dir = Path(m.group(1).strip())
+                current.work_dir = base_dir / m.group(1).strip()
             if not current.command and (m := command_re.search(line)):
                 current.command = m.group(1)
     if not runs:
         # No explicit sessions in the log; synthesize a single entry based on mtime
         lines = log_path.read_text(errors="replace").splitlines()
-        started = parse_log_timestamp(lines[0].split("[")[0].strip()) if lines else None
+        started = parse_log_timestamp(lines[0], reference) if lines else None
         runs.append(
             RunSummary(
                 run_id=fallback_run_id(base_dir, started),
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import csv
+import importlib
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, TextIO
+
+from .models import RunDetails, TaskRecord
+from .tasks import iter_tasks
+
+LOG = logging.getLogger("nflog")
+
+EXPORT_FORMATS = ("csv", "arrow", "parquet")
+EXPORT_COLUMNS = [
+    "task_hash",
+    "process_name",
+    "exit_code",
+    "status",
+    "started",
+    "ended",
+    "work_dir",
+    "err_path",
+    "realtime_ms",
+    "pct_cpu",
+    "peak_rss",
+    "peak_vmem",
+    "rchar",
+    "wchar",
+]
+DEFAULT_BATCH_SIZE = 16384
+
+
+def export_tasks(run: RunDetails, output: Path | str, fmt: str = "csv", batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Write one row per task of the run to ``output`` and return the number of rows written.
+
+    Rows are streamed from the task scan in batches of ``batch_size``; CSV needs no extra
+    dependencies while Arrow IPC and Parquet require pyarrow. ``output`` may be "-" for CSV
+    on stdout.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {fmt}; choose from {', '.join(EXPORT_FORMATS)}.")
+    records = iter_tasks(run, include_running=True)
+    if fmt == "csv":
+        if str(output) == "-":
+            return _write_csv(records, sys.stdout)
+        with open(output, "w", newline="") as handle:
+            return _write_csv(records, handle)
+    if str(output) == "-":
+        raise ValueError(f"Writing {fmt} to stdout is not supported; pass an output path.")
+    pa = _require("pyarrow")
+    schema = _arrow_schema(pa)
+    written = 0
+    if fmt == "parquet":
+        pq = _require("pyarrow.parquet")
+        with pq.ParquetWriter(str(output), schema) as writer:
+            for batch in _arrow_batches(pa, schema, records, batch_size):
+                writer.write_table(pa.Table.from_batches([batch], schema=schema))
+                written += batch.num_rows
+        return written
+    with pa.OSFile(str(output), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in _arrow_batches(pa, schema, records, batch_size):
+            writer.write_batch(batch)
+            written += batch.num_rows
+    return written
+
+
+def tasks_frame(run: RunDetails, batch_size: int = DEFAULT_BATCH_SIZE) -> Any:
+    """
+    Return the run's task table as a pandas DataFrame (one row per task).
+
+    When pyarrow is installed the frame is assembled from Arrow record batches so that
+    rows never exist as Python dicts all at once.
+    """
+    pd = _require("pandas")
+    records = iter_tasks(run, include_running=True)
+    try:
+        pa = importlib.import_module("pyarrow")
+    except ImportError:
+        frames = [pd.DataFrame(columns, columns=EXPORT_COLUMNS) for columns in _column_batches(records, batch_size)]
+        if not frames:
+            return pd.DataFrame(columns=EXPORT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+    schema = _arrow_schema(pa)
+    table = pa.Table.from_batches(list(_arrow_batches(pa, schema, records, batch_size)), schema=schema)
+    return table.to_pandas()
+
+
+def task_row(record: TaskRecord) -> Dict[str, Any]:
+    return {
+        "task_hash": record.task_hash,
+        "process_name": record.process_name,
+        "exit_code": record.exit_code,
+        "status": record.status,
+        "started": record.started,
+        "ended": record.ended,
+        "work_dir": str(record.work_dir),
+        "err_path": str(record.err_path) if record.err_path else None,
+        "realtime_ms": record.realtime_ms,
+        "pct_cpu": record.pct_cpu,
+        "peak_rss": record.peak_rss,
+        "peak_vmem": record.peak_vmem,
+        "rchar": record.rchar,
+        "wchar": record.wchar,
+    }
+
+
+def _write_csv(records: Iterable[TaskRecord], handle: TextIO) -> int:
+    writer = csv.writer(handle)
+    writer.writerow(EXPORT_COLUMNS)
+    written = 0
+    for record in records:
+        row = task_row(record)
+        writer.writerow([_csv_value(row[column]) for column in EXPORT_COLUMNS])
+        written += 1
+    return written
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _column_batches(records: Iterable[TaskRecord], batch_size: int) -> Iterator[Dict[str, List[Any]]]:
+    columns: Dict[str, List[Any]] = {column: [] for column in EXPORT_COLUMNS}
+    size = 0
+    for record in records:
+        for column, value in task_row(record).items():
+            columns[column].append(value)
+        size += 1
+        if size >= batch_size:
+            yield columns
+            columns = {column: [] for column in EXPORT_COLUMNS}
+            size = 0
+    if size:
+        yield columns
+
+
+def _arrow_schema(pa: Any) -> Any:
+    return pa.schema(
+        [
+            ("task_hash", pa.string()),
+            ("process_name", pa.string()),
+            ("exit_code", pa.int32()),
+            ("status", pa.string()),
+            ("started", pa.timestamp("us")),
+            ("ended", pa.timestamp("us")),
+            ("work_dir", pa.string()),
+            ("err_path", pa.string()),
+            ("realtime_ms", pa.int64()),
+            ("pct_cpu", pa.float64()),
+            ("peak_rss", pa.int64()),
+            ("peak_vmem", pa.int64()),
+            ("rchar", pa.int64()),
+            ("wchar", pa.int64()),
+        ]
+    )
+
+
+def _arrow_batches(pa: Any, schema: Any, records: Iterable[TaskRecord], batch_size: int) -> Iterator[Any]:
+    for columns in _column_batches(records, batch_size):
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def _require(module: str) -> Any:
+    try:
+        return importlib.import_module(module)
+    except ImportError as exc:
+        package = module.split(".")[0]
+        raise RuntimeError(f"{package} is required for this export; install it with `pip install 'nflog[export]'`.") from exc
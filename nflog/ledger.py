@@ -0,0 +1,235 @@
+"""
+Append-only ledger of failures across sessions.
+
+Every run inspected with ``nflog failed`` appends one JSON line per failed task to
+``.nextflow/nflog/failures.jsonl``: session, run name, start, task hash, process, exit
+code and a normalized error signature (the telling line of .command.err with paths,
+numbers and hashes masked). A plain inspection records the failures it shows; ``--history``
+and finished runs record all of them, and a line marking the launch complete is added once
+a finished run has been recorded in full, so later inspections skip it. Launches are told apart by
+session and start time, since ``-resume`` reuses the session id.
+
+``failures.index.json`` folds the ledger into per-signature first/last launches and
+counts, plus the byte offset it has read up to; lookups only read the index and the
+ledger lines appended since.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from .bundle import is_snapshot
+from .errors import iter_failures
+from .models import ErrorItem, FailureHistory, RunDetails
+from .tasks import run_finished
+from .utils import read_process_name, tail_text
+
+LOG = logging.getLogger("nflog")
+
+LEDGER_VERSION = 2
+LEDGER_NAME = "failures.jsonl"
+INDEX_NAME = "failures.index.json"
+SIGNATURE_CHARS = 160
+ERROR_LINE_RE = re.compile(r"error|exception|fatal|killed|denied|not found|no such|out of memory|segmentation|abort", re.IGNORECASE)
+MASKS = (
+    (re.compile(r"(?:/[\w.@+-]+)+/?"), "<path>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE), "<uuid>"),
+    (re.compile(r"\b(?:0x[0-9a-f]+|(?=[0-9a-f]*\d)[0-9a-f]{7,})\b", re.IGNORECASE), "<hex>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def error_signature(text: str) -> str:
+    """
+    Reduce an error excerpt to a line that stays the same across sessions: the last line
+    that looks like an error (else the last non-empty line), with paths, ids and numbers
+    masked.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines:
+        return ""
+    line = next((line for line in reversed(lines) if ERROR_LINE_RE.search(line)), lines[-1])
+    for pattern, replacement in MASKS:
+        line = pattern.sub(replacement, line)
+    return line.strip()[:SIGNATURE_CHARS]
+
+
+def launch_key(session: str, started: Optional[str], run_name: Optional[str]) -> str:
+    return f"{session}@{started or run_name or '-'}"
+
+
+def signature_key(process_name: Optional[str], exit_code: Optional[int], signature: str) -> str:
+    raw = f"{process_name or '-'}\0{exit_code if exit_code is not None else '-'}\0{signature}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class FailureLedger:
+    def __init__(self, base_dir: Path) -> None:
+        self.dir = base_dir / ".nextflow" / "nflog"
+        self.path = self.dir / LEDGER_NAME
+        self.index_path = self.dir / INDEX_NAME
+
+    def record(
+        self,
+        run: RunDetails,
+        failures: Optional[Iterable[Tuple[Path, Optional[int], Optional[str]]]] = None,
+        partial: bool = False,
+    ) -> int:
+        """
+        Append the launch's failures not yet in the ledger; returns how many were added.
+        ``failures`` are ``iter_failures`` results the caller already has; with ``partial``
+        they are only the first few, as shown by a plain ``nflog failed``. A finished launch
+        recorded from a full scan is marked complete and never scanned again.
+        """
+        index = self.load()
+        started = run.started.isoformat() if run.started else None
+        launch = launch_key(run.run_id, started, run.run_name)
+        if self._complete(index, launch):
+            return 0
+        known = index["tasks"].get(launch, {})
+        rows = []
+        for task_dir, exit_code, _ in iter_failures(run) if failures is None else failures:
+            task_hash = f"{task_dir.parent.name}/{task_dir.name}"
+            if task_hash in known:
+                continue
+            excerpt = tail_text(task_dir / ".command.err", max_lines=30).strip() or tail_text(task_dir / ".command.log", max_lines=30).strip()
+            rows.append(
+                {
+                    "session": run.run_id,
+                    "run_name": run.run_name,
+                    "started": started,
+                    "hash": task_hash,
+                    "process": read_process_name(task_dir / ".command.run"),
+                    "exit": exit_code,
+                    "signature": error_signature(excerpt),
+                }
+            )
+        if not partial and run_finished(run):
+            rows.append({"session": run.run_id, "run_name": run.run_name, "started": started, "complete": True})
+        if rows:
+            self._append(rows)
+        return sum(1 for row in rows if "hash" in row)
+
+    def is_complete(self, run: RunDetails) -> bool:
+        started = run.started.isoformat() if run.started else None
+        return self._complete(self.load(), launch_key(run.run_id, started, run.run_name))
+
+    def lookup(self, items: Iterable[ErrorItem]) -> List[Optional[FailureHistory]]:
+        """
+        History of each failure's signature, in input order (None when never recorded).
+        """
+        index = self.load()
+        launches = index["launches"]
+        found: List[Optional[FailureHistory]] = []
+        for item in items:
+            signature = error_signature(item.err_excerpt)
+            entry = index["signatures"].get(signature_key(item.process_name, item.exit_code, signature))
+            if entry is None:
+                found.append(None)
+                continue
+            ordered = sorted((launches[launch] for launch in entry["launches"]), key=lambda state: state["started"] or "")
+            found.append(
+                FailureHistory(
+                    signature=signature,
+                    process_name=item.process_name,
+                    exit_code=item.exit_code,
+                    first_session=ordered[0]["session"],
+                    first_started=ordered[0]["started"],
+                    last_session=ordered[-1]["session"],
+                    last_started=ordered[-1]["started"],
+                    sessions=len({state["session"] for state in ordered}),
+                    launches=len(ordered),
+                    occurrences=entry["tasks"],
+                )
+            )
+        return found
+
+    def load(self) -> dict:
+        """
+        The index, brought up to date with ledger lines appended since it was written.
+        """
+        index = self._empty_index()
+        try:
+            stored = json.loads(self.index_path.read_text())
+            if stored.get("version") == LEDGER_VERSION:
+                index = stored
+        except (OSError, ValueError):
+            pass
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return self._empty_index()
+        if size < index["offset"]:
+            # Ledger replaced or truncated: rebuild from the start.
+            index = self._empty_index()
+        if size > index["offset"]:
+            with self.path.open("rb") as handle:
+                handle.seek(index["offset"])
+                data = handle.read()
+            complete = data[: data.rfind(b"\n") + 1]
+            for line in complete.decode(errors="replace").splitlines():
+                try:
+                    self._fold(index, json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    LOG.debug("Skipping malformed ledger line in %s", self.path)
+            index["offset"] += len(complete)
+            self._write_index(index)
+        return index
+
+    def _append(self, rows: List[dict]) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write("".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows))
+
+    def _write_index(self, index: dict) -> None:
+        partial = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            partial.write_text(json.dumps(index, separators=(",", ":")))
+            os.replace(partial, self.index_path)
+        except OSError as exc:
+            LOG.debug("Unable to write %s: %s", self.index_path, exc)
+
+    @staticmethod
+    def _complete(index: dict, launch: str) -> bool:
+        state = index["launches"].get(launch)
+        return bool(state and state["complete"])
+
+    @staticmethod
+    def _empty_index() -> dict:
+        return {"version": LEDGER_VERSION, "offset": 0, "launches": {}, "tasks": {}, "signatures": {}}
+
+    @staticmethod
+    def _fold(index: dict, row: dict) -> None:
+        session = row["session"]
+        launch = launch_key(session, row.get("started"), row.get("run_name"))
+        state = index["launches"].setdefault(
+            launch, {"session": session, "run_name": row.get("run_name"), "started": row.get("started"), "complete": False}
+        )
+        if row.get("complete"):
+            state["complete"] = True
+            return
+        tasks = index["tasks"].setdefault(launch, {})
+        if row["hash"] in tasks:
+            return
+        tasks[row["hash"]] = 1
+        key = signature_key(row.get("process"), row.get("exit"), row.get("signature") or "")
+        entry = index["signatures"].setdefault(key, {"launches": [], "tasks": 0})
+        entry["tasks"] += 1
+        if launch not in entry["launches"]:
+            entry["launches"].append(launch)
+
+
+def ledger_for(run: RunDetails) -> Optional[FailureLedger]:
+    """
+    The ledger of the run's project, or None for read-only snapshot bundles.
+    """
+    base = run.log_path.parent
+    if is_snapshot(base):
+        return None
+    return FailureLedger(base)
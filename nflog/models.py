@@ -3,7 +3,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+# Straggler ratios and thresholds never divide by less than this many seconds, so a process
+# of near-instant tasks still flags its one slow task.
+MEDIAN_FLOOR_SECONDS = 1.0
 
 
 @dataclass
@@ -39,6 +43,9 @@ class RunStatus:
     overall: str
     counts: dict
     details_from: str
+    estimated: bool = False
+    # 95% confidence bounds per count when estimated: {"failed": (low, high), ...}
+    intervals: Optional[dict] = None
 
 
 @dataclass
@@ -52,3 +59,107 @@ class ErrorItem:
     script_path: Optional[Path]
     err_excerpt: str
     note: Optional[str] = None
+
+
+@dataclass
+class CacheEntry:
+    task_hash: str
+    cached: Optional[bool]
+
+
+@dataclass
+class TaskRecord:
+    run_id: str
+    task_hash: str
+    process_name: Optional[str]
+    exit_code: Optional[int]
+    status: str
+    started: Optional[datetime]
+    ended: Optional[datetime]
+    work_dir: Path
+    err_path: Optional[Path]
+    realtime_ms: Optional[int] = None
+    pct_cpu: Optional[float] = None
+    peak_rss: Optional[int] = None
+    peak_vmem: Optional[int] = None
+    rchar: Optional[int] = None
+    wchar: Optional[int] = None
+
+
+@dataclass
+class Timeline:
+    run_id: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+    tasks: int
+    peak: int
+    mean: float
+    # Step function of (epoch seconds, running tasks from that instant on)
+    curve: List[Tuple[float, int]]
+    processes: Dict[str, dict]
+
+
+@dataclass
+class Straggler:
+    run_id: str
+    task_hash: str
+    process_name: str
+    status: str
+    duration: float
+    median: float
+    p95: float
+    process_tasks: int
+    work_dir: Path
+
+    @property
+    def ratio(self) -> float:
+        return self.duration / max(self.median, MEDIAN_FLOOR_SECONDS)
+
+
+@dataclass
+class ResumeStep:
+    run_name: Optional[str]
+    started: Optional[datetime]
+    resumed: bool
+    cached: int
+    executed: int
+    failed: int
+    cpu_hours: float
+    untraced: int
+    processes: Dict[str, dict]
+    source: str
+
+
+@dataclass
+class ResumeReport:
+    run_id: str
+    steps: List[ResumeStep]
+    reexecuted_cpu_hours: float
+    # Re-executed work per process across all resumed launches
+    processes: Dict[str, dict]
+
+
+@dataclass
+class GrepMatch:
+    run_id: str
+    task_hash: str
+    process_name: Optional[str]
+    path: Path
+    line_number: int
+    line: str
+
+
+@dataclass
+class FailureHistory:
+    signature: str
+    process_name: Optional[str]
+    exit_code: Optional[int]
+    first_session: str
+    first_started: Optional[str]
+    last_session: str
+    last_started: Optional[str]
+    # Distinct sessions and launches (-resume reuses the session) the failure was seen in,
+    # and failed tasks across them
+    sessions: int
+    launches: int
+    occurrences: int
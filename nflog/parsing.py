@@ -0,0 +1,146 @@
+"""
+Fast parsers for the timestamp and duration formats found in Nextflow's history and log.
+
+Both timestamp formats have a fixed layout, so the common case is string slicing plus
+``int`` instead of ``strptime``; anything off-layout falls back to ``strptime``. Log lines
+carry no year: it is inferred from a reference time (normally the log's mtime, which is
+at or after its last line), so a log spanning New Year gets December lines in the
+previous year. Work that repeats across consecutive lines (the month-day prefix, whole
+seconds, duration strings) is memoized.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+
+LOG = logging.getLogger("nflog")
+
+MONTHS = {name: number for number, name in enumerate(("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), start=1)}
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
+# A line may be stamped slightly after the reference (clock skew, mtime granularity)
+# without being pushed back a year.
+YEAR_SLACK = timedelta(days=1)
+MEMO_SIZE = 4096
+
+
+def parse_history_timestamp(raw: str) -> Optional[datetime]:
+    """
+    Parse '2024-01-13 16:16:24' from the first column of .nextflow/history.
+    """
+    raw = raw.strip()
+    if len(raw) == 19 and raw[4] == "-" and raw[7] == "-" and raw[10] == " " and raw[13] == ":" and raw[16] == ":":
+        try:
+            return datetime(int(raw[0:4]), int(raw[5:7]), int(raw[8:10]), int(raw[11:13]), int(raw[14:16]), int(raw[17:19]))
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(raw, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        LOG.debug("Unable to parse history timestamp %s", raw)
+        return None
+
+
+def parse_log_timestamp(raw: str, reference: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Parse the 'Jan-13 16:16:24.765' prefix of a .nextflow.log line (the rest of the line
+    is ignored). The year is the latest one that does not put the timestamp after
+    ``reference`` (default: now).
+    """
+    reference = reference or datetime.now()
+    day = reference.date()
+    if len(raw) >= 15 and raw[3] == "-" and raw[6] == " " and raw[9] == ":" and raw[12] == ":":
+        stamp = _log_second(raw[:15], day)
+        if stamp is not None:
+            if len(raw) >= 19 and raw[15] == "." and raw[16:19].isdigit():
+                return stamp.replace(microsecond=int(raw[16:19]) * 1000)
+            return stamp
+    parts = raw.split()
+    if len(parts) < 2:
+        LOG.debug("Unable to parse log timestamp %s", raw)
+        return None
+    for layout in ("%b-%d %H:%M:%S.%f", "%b-%d %H:%M:%S"):
+        try:
+            # Parsed in a leap year so Feb-29 is accepted before the real year is known.
+            parsed = datetime.strptime(f"2000 {parts[0]} {parts[1]}", f"%Y {layout}")
+        except ValueError:
+            continue
+        try:
+            return parsed.replace(year=infer_year(parsed.month, parsed.day, day))
+        except ValueError:
+            break
+    LOG.debug("Unable to parse log timestamp %s", raw)
+    return None
+
+
+def infer_year(month: int, day: int, reference: date) -> int:
+    """
+    Year of a month-day seen in a log whose last write was ``reference``: the reference
+    year, or an earlier one when the month-day would fall after the reference. Feb-29
+    goes back to the closest leap year.
+    """
+    limit = reference + YEAR_SLACK
+    year = limit.year
+    for _ in range(8):
+        try:
+            if date(year, month, day) <= limit:
+                return year
+        except ValueError:
+            pass
+        year -= 1
+    raise ValueError(f"Invalid log date {month:02d}-{day:02d}")
+
+
+def parse_duration(raw: str) -> Optional[timedelta]:
+    """
+    Parse history durations: '1d 4h', '1h 2m 3s', '3.4s', '120ms' or bare seconds.
+    """
+    raw = (raw or "").strip()
+    if not raw or raw == "-":
+        return None
+    seconds = _duration_seconds(raw)
+    return timedelta(seconds=seconds) if seconds is not None else None
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _duration_seconds(raw: str) -> Optional[float]:
+    total = 0.0
+    for token in raw.split():
+        unit = token.lstrip("0123456789.")
+        number = token[: len(token) - len(unit)]
+        if unit not in DURATION_UNITS and not (unit == "" and len(raw.split()) == 1):
+            LOG.debug("Unable to parse duration %s", raw)
+            return None
+        try:
+            total += float(number) * DURATION_UNITS.get(unit, 1)
+        except ValueError:
+            LOG.debug("Unable to parse duration %s", raw)
+            return None
+    return total
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _log_second(prefix: str, reference: date) -> Optional[datetime]:
+    """
+    'Jan-13 16:16:24' to a datetime; consecutive log lines mostly share the whole second.
+    """
+    month_day = _log_day(prefix[:6], reference)
+    if month_day is None:
+        return None
+    try:
+        return datetime(*month_day, int(prefix[7:9]), int(prefix[10:12]), int(prefix[13:15]))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _log_day(prefix: str, reference: date) -> Optional[Tuple[int, int, int]]:
+    month = MONTHS.get(prefix[:3])
+    if month is None or not prefix[4:6].isdigit():
+        return None
+    day = int(prefix[4:6])
+    try:
+        return infer_year(month, day, reference), month, day
+    except ValueError:
+        return None
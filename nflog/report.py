@@ -0,0 +1,299 @@
+"""
+Self-contained HTML report of one run.
+
+All numbers come from a single ``iter_session_tasks`` pass (cache-aware membership):
+status counts, per-process summaries, the failure list and the task intervals feeding the
+timeline are collected together. The tables are embedded as compact columnar JSON and
+rendered by a small inline script, so the file needs no network access and stays small
+for runs with 100k tasks.
+"""
+from __future__ import annotations
+
+import html
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .models import RunDetails, TaskRecord
+from .stragglers import P2Quantile, task_duration
+from .tasks import cpu_hours, iter_session_tasks
+from .timeline import bin_curve, build_timeline, task_intervals
+from .utils import tail_text
+
+LOG = logging.getLogger("nflog")
+
+DEFAULT_MAX_EXCERPTS = 200
+DEFAULT_BINS = 120
+EXCERPT_LINES = 20
+EXCERPT_CHARS = 2000
+PROCESS_COLUMNS = ["process", "tasks", "succeeded", "failed", "running", "median_s", "max_s", "cpu_hours", "max_rss", "peak", "mean"]
+FAILURE_COLUMNS = ["hash", "process", "exit", "dir", "excerpt"]
+
+
+@dataclass
+class ReportStats:
+    path: Path
+    tasks: int
+    failures: int
+    size: int
+
+
+def write_report(
+    run: RunDetails,
+    output: Path | str,
+    max_excerpts: int = DEFAULT_MAX_EXCERPTS,
+    bins: int = DEFAULT_BINS,
+) -> ReportStats:
+    output = Path(output)
+    data = report_data(run, max_excerpts=max_excerpts, bins=bins)
+    payload = json.dumps(data, separators=(",", ":"), default=str).replace("</", "<\\/")
+    title = html.escape(f"nflog report: {run.run_name or run.run_id}")
+    output.write_text(REPORT_TEMPLATE.replace("__TITLE__", title).replace("__DATA__", payload), encoding="utf-8")
+    return ReportStats(path=output, tasks=data["tasks"], failures=data["failures"]["total"], size=output.stat().st_size)
+
+
+def report_data(run: RunDetails, max_excerpts: int = DEFAULT_MAX_EXCERPTS, bins: int = DEFAULT_BINS) -> dict:
+    """
+    Everything the report shows, gathered in one scan of the run's task dirs. Only the
+    first ``max_excerpts`` failures get a .command.err excerpt.
+    """
+    summary = _Summary(run, max_excerpts)
+    now = time.time()
+    intervals = task_intervals(summary.observe(iter_session_tasks(run, include_running=True, with_trace=True), now), run, now=now)
+    timeline = build_timeline(run.run_id, intervals)
+    binned = bin_curve(timeline.curve, bins)
+    processes = [
+        [
+            name,
+            stats["tasks"],
+            stats["succeeded"],
+            stats["failed"],
+            stats["running"],
+            round(stats["median"].value(), 1) if stats["median"].count else None,
+            round(stats["max"], 1) if stats["median"].count else None,
+            round(stats["cpu_hours"], 3),
+            stats["max_rss"],
+            timeline.processes.get(name, {}).get("peak", 0),
+            timeline.processes.get(name, {}).get("mean", 0.0),
+        ]
+        for name, stats in sorted(summary.processes.items())
+    ]
+    return {
+        "run": {
+            "run_id": run.run_id,
+            "run_name": run.run_name,
+            "status": run.status,
+            "started": run.started,
+            "ended": run.ended,
+            "duration": str(run.duration) if run.duration else None,
+            "command": run.command,
+            "work_dir": str(run.work_dir),
+        },
+        "generated": datetime.now().replace(microsecond=0),
+        "tasks": summary.tasks,
+        "counts": summary.counts,
+        "processes": {"columns": PROCESS_COLUMNS, "rows": processes},
+        "failures": {"columns": FAILURE_COLUMNS, "rows": summary.failures, "total": len(summary.failures), "excerpts": summary.excerpts},
+        "timeline": {
+            "start": timeline.start,
+            "end": timeline.end,
+            "peak": timeline.peak,
+            "mean": timeline.mean,
+            "width": (binned[1][0] - binned[0][0]) if len(binned) > 1 else 0,
+            "bins": [[round(ts - binned[0][0], 1), round(mean, 2), peak] for ts, mean, peak in binned],
+        },
+    }
+
+
+class _Summary:
+    def __init__(self, run: RunDetails, max_excerpts: int) -> None:
+        self.run = run
+        self.max_excerpts = max_excerpts
+        self.tasks = 0
+        self.counts: Dict[str, int] = {"succeeded": 0, "failed": 0, "cached": 0, "running": 0, "unknown": 0}
+        self.processes: Dict[str, dict] = {}
+        self.failures: List[list] = []
+        self.excerpts = 0
+
+    def observe(self, records: Iterable[TaskRecord], now: float) -> Iterator[TaskRecord]:
+        for record in records:
+            self.tasks += 1
+            self.counts[record.status] = self.counts.get(record.status, 0) + 1
+            if record.status == "cached":
+                # Ran in an earlier launch: counted, but kept out of durations and the timeline.
+                continue
+            name = record.process_name or "-"
+            stats = self.processes.get(name)
+            if stats is None:
+                stats = self.processes[name] = {
+                    "tasks": 0,
+                    "succeeded": 0,
+                    "failed": 0,
+                    "running": 0,
+                    "median": P2Quantile(0.5),
+                    "max": 0.0,
+                    "cpu_hours": 0.0,
+                    "max_rss": None,
+                }
+            stats["tasks"] += 1
+            if record.status in ("succeeded", "failed", "running"):
+                stats[record.status] += 1
+            duration = task_duration(record, self.run, now)
+            if duration is not None:
+                stats["median"].add(duration)
+                stats["max"] = max(stats["max"], duration)
+            stats["cpu_hours"] += cpu_hours(record) or 0.0
+            if record.peak_rss is not None:
+                stats["max_rss"] = max(stats["max_rss"] or 0, record.peak_rss)
+            if record.status == "failed":
+                self.failures.append(self._failure_row(record, name))
+            yield record
+
+    def _failure_row(self, record: TaskRecord, name: str) -> list:
+        excerpt: Optional[str] = None
+        if self.excerpts < self.max_excerpts:
+            excerpt = tail_text(record.work_dir / ".command.err", max_lines=EXCERPT_LINES).strip()
+            if not excerpt:
+                excerpt = tail_text(record.work_dir / ".command.log", max_lines=EXCERPT_LINES).strip()
+            excerpt = excerpt[-EXCERPT_CHARS:]
+            self.excerpts += 1
+        try:
+            relative = record.work_dir.relative_to(self.run.work_dir).as_posix()
+        except ValueError:
+            relative = str(record.work_dir)
+        return [record.task_hash, name, record.exit_code, relative, excerpt]
+
+
+REPORT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__TITLE__</title>
+<style>
+body { font-family: system-ui, sans-serif; margin: 2rem; color: #222; }
+h1 { font-size: 1.4rem; }
+h2 { font-size: 1.1rem; margin-top: 2rem; }
+table { border-collapse: collapse; font-size: 0.85rem; }
+th, td { padding: 0.25rem 0.6rem; text-align: left; border-bottom: 1px solid #ddd; vertical-align: top; }
+th { color: #1f4e99; }
+dl { display: grid; grid-template-columns: max-content auto; gap: 0.2rem 1rem; }
+dt { font-weight: bold; }
+pre { margin: 0; max-width: 70rem; white-space: pre-wrap; font-size: 0.8rem; background: #f6f6f6; }
+.counts span { display: inline-block; margin-right: 1.5rem; font-size: 1.1rem; }
+.failed { color: #b00020; } .succeeded { color: #2e7d32; } .running { color: #b26a00; }
+.pager button { margin-right: 0.5rem; }
+input { margin-bottom: 0.5rem; }
+svg { background: #fafafa; border: 1px solid #ddd; }
+</style>
+</head>
+<body>
+<h1 id="title"></h1>
+<dl id="meta"></dl>
+<div class="counts" id="counts"></div>
+<h2>Timeline</h2>
+<div id="timeline"></div>
+<h2>Processes</h2>
+<div id="processes"></div>
+<h2>Failures</h2>
+<input id="filter" placeholder="Filter by process or exit code">
+<div id="failures"></div>
+<script id="nflog-data" type="application/json">__DATA__</script>
+<script>
+const data = JSON.parse(document.getElementById("nflog-data").textContent);
+const PAGE = 100;
+const el = (tag, attrs, text) => {
+  const node = document.createElement(tag);
+  Object.assign(node, attrs || {});
+  if (text !== undefined && text !== null) node.textContent = text;
+  return node;
+};
+const run = data.run;
+document.getElementById("title").textContent = "Run " + (run.run_name || run.run_id);
+const meta = document.getElementById("meta");
+for (const [key, value] of Object.entries({"Session": run.run_id, "Status": run.status, "Started": run.started,
+    "Ended": run.ended, "Duration": run.duration, "Command": run.command, "Work dir": run.work_dir, "Generated": data.generated})) {
+  meta.append(el("dt", {}, key), el("dd", {}, value || "-"));
+}
+const counts = document.getElementById("counts");
+counts.append(el("span", {}, "tasks: " + data.tasks));
+for (const [key, value] of Object.entries(data.counts)) counts.append(el("span", {className: key}, key + ": " + value));
+
+function table(target, columns, rows, cell) {
+  let page = 0;
+  const render = () => {
+    target.replaceChildren();
+    const tbl = el("table");
+    const head = el("tr");
+    columns.forEach(name => head.append(el("th", {}, name)));
+    tbl.append(head);
+    for (const row of rows.slice(page * PAGE, (page + 1) * PAGE)) {
+      const tr = el("tr");
+      row.forEach((value, index) => tr.append(cell ? cell(index, value) : el("td", {}, value ?? "-")));
+      tbl.append(tr);
+    }
+    target.append(tbl);
+    if (rows.length > PAGE) {
+      const pager = el("div", {className: "pager"});
+      const last = Math.ceil(rows.length / PAGE) - 1;
+      pager.append(el("button", {disabled: page === 0, onclick: () => { page--; render(); }}, "previous"),
+        el("button", {disabled: page === last, onclick: () => { page++; render(); }}, "next"),
+        el("span", {}, `rows ${page * PAGE + 1}-${Math.min(rows.length, (page + 1) * PAGE)} of ${rows.length}`));
+      target.append(pager);
+    }
+  };
+  render();
+}
+
+table(document.getElementById("processes"), data.processes.columns, data.processes.rows);
+
+const failures = data.failures;
+const failureCell = (index, value) => {
+  const td = el("td");
+  if (index === 4) {
+    if (value) td.append(el("pre", {}, value));
+  } else {
+    td.textContent = value ?? "-";
+  }
+  return td;
+};
+const showFailures = query => {
+  const rows = query ? failures.rows.filter(row => row[1].includes(query) || String(row[2]) === query) : failures.rows;
+  table(document.getElementById("failures"), failures.columns, rows, failureCell);
+};
+document.getElementById("filter").addEventListener("input", event => showFailures(event.target.value.trim()));
+showFailures("");
+if (failures.total > failures.excerpts) {
+  document.getElementById("failures").before(el("p", {}, `Excerpts kept for the first ${failures.excerpts} of ${failures.total} failures.`));
+}
+
+const tl = data.timeline;
+const box = document.getElementById("timeline");
+if (!tl.bins.length) {
+  box.textContent = "No task start/end times recorded.";
+} else {
+  const width = 900, height = 180, top = Math.max(1, ...tl.bins.map(bin => bin[2]));
+  const x = index => index / tl.bins.length * width;
+  const y = value => height - value / top * (height - 10);
+  const line = (column, color) => {
+    const points = tl.bins.map((bin, index) => `${x(index)},${y(bin[column])} ${x(index + 1)},${y(bin[column])}`).join(" ");
+    const node = document.createElementNS("http://www.w3.org/2000/svg", "polyline");
+    node.setAttribute("points", points);
+    node.setAttribute("fill", "none");
+    node.setAttribute("stroke", color);
+    return node;
+  };
+  const svg = document.createElementNS("http://www.w3.org/2000/svg", "svg");
+  svg.setAttribute("width", width);
+  svg.setAttribute("height", height);
+  svg.append(line(2, "#b3c7e6"), line(1, "#1f4e99"));
+  box.append(svg, el("p", {}, `Running tasks from ${tl.start} to ${tl.end}: peak ${tl.peak}, mean ${tl.mean} (dark: mean per slice, light: max).`));
+}
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .bundle import project_root
+from .cache import cache_dir, read_cache_index, task_dir_for
+from .discovery import get_run, run_details, session_runs
+from .models import ResumeReport, ResumeStep, RunDetails, TaskRecord
+from .status import RunIntervalIndex
+from .tasks import cpu_hours, task_record
+from .utils import file_mtime, iter_task_markers, read_process_name
+
+LOG = logging.getLogger("nflog")
+
+ROTATED_LOGS = 9
+SESSION_RE = re.compile(r"Session UUID: ([a-z0-9-]+)", re.IGNORECASE)
+RUN_NAME_RE = re.compile(r"Run name: ([\w\-]+)")
+CACHED_RE = re.compile(r"\[[0-9a-f]{2}/[0-9a-f]{6}\] Cached process > ([^\s(]+)")
+
+
+def resume_report(run_id: Optional[str] = None, base_dir: Path | str = ".") -> ResumeReport:
+    """
+    Cached vs. executed tasks for every launch of a session, and the compute re-spent on
+    resumes.
+
+    Launches are the session's history entries. A launch with a cache index
+    (``index.<runName>``) is classified from it with direct task-dir lookups; the others
+    share a single work-dir walk, each task going to the one launch whose window holds its
+    .exitcode (see ``_owning_launch``), and take their cached counts from ``Cached process`` lines in the logs.
+    Compute is realtime x %cpu from .command.trace (one core when %cpu is missing).
+    """
+    base = project_root(base_dir)
+    session = get_run(run_id, base)
+    launches = [run_details(summary) for summary in session_runs(session.run_id, base)] or [session]
+    indexes = [_index_entries(launch) for launch in launches]
+    scanned = _scan_launches([launch for launch, index in zip(launches, indexes) if index is None])
+    logged = _cached_from_logs(base, session.run_id)
+
+    steps: List[ResumeStep] = []
+    rollup: Dict[str, dict] = defaultdict(lambda: {"tasks": 0, "cpu_hours": 0.0})
+    for position, (launch, index) in enumerate(zip(launches, indexes)):
+        processes: Dict[str, dict] = defaultdict(lambda: {"cached": 0, "executed": 0, "failed": 0, "cpu_hours": 0.0})
+        if index is not None:
+            executed = []
+            for task_hash, cached in index:
+                task_dir = task_dir_for(launch.work_dir, task_hash)
+                if cached:
+                    processes[read_process_name(task_dir / ".command.run") or "-"]["cached"] += 1
+                else:
+                    executed.append(task_record(launch, task_dir, with_trace=True))
+            source = "nextflow cache index"
+        else:
+            executed = scanned.get(id(launch), [])
+            for name, count in logged.get(launch.run_name, Counter()).items():
+                processes[name]["cached"] += count
+            source = "log + work/.exitcode files"
+        untraced = 0
+        for record in executed:
+            stats = processes[record.process_name or "-"]
+            stats["executed"] += 1
+            if record.status == "failed":
+                stats["failed"] += 1
+            cpu = cpu_hours(record)
+            if cpu is None:
+                untraced += 1
+                continue
+            stats["cpu_hours"] += cpu
+        for stats in processes.values():
+            stats["cpu_hours"] = round(stats["cpu_hours"], 4)
+        resumed = position > 0
+        if resumed:
+            for name, stats in processes.items():
+                if stats["executed"]:
+                    rollup[name]["tasks"] += stats["executed"]
+                    rollup[name]["cpu_hours"] = round(rollup[name]["cpu_hours"] + stats["cpu_hours"], 4)
+        steps.append(
+            ResumeStep(
+                run_name=launch.run_name,
+                started=launch.started,
+                resumed=resumed,
+                cached=sum(stats["cached"] for stats in processes.values()),
+                executed=len(executed),
+                failed=sum(stats["failed"] for stats in processes.values()),
+                cpu_hours=round(sum(stats["cpu_hours"] for stats in processes.values()), 4),
+                untraced=untraced,
+                processes=dict(sorted(processes.items())),
+                source=source,
+            )
+        )
+    return ResumeReport(
+        run_id=session.run_id,
+        steps=steps,
+        reexecuted_cpu_hours=round(sum(step.cpu_hours for step in steps if step.resumed), 4),
+        processes=dict(sorted(rollup.items(), key=lambda item: item[1]["cpu_hours"], reverse=True)),
+    )
+
+
+def _index_entries(launch: RunDetails) -> Optional[List[Tuple[str, bool]]]:
+    if not launch.run_name:
+        return None
+    index_path = cache_dir(launch) / f"index.{launch.run_name}"
+    if not index_path.exists():
+        return None
+    try:
+        return list(read_cache_index(index_path))
+    except (OSError, ValueError) as exc:
+        LOG.debug("Unable to read %s: %s", index_path, exc)
+        return None
+
+
+def _scan_launches(launches: List[RunDetails]) -> Dict[int, List[TaskRecord]]:
+    """
+    One walk per work dir shared by all launches without a cache index.
+    """
+    found: Dict[int, List[TaskRecord]] = defaultdict(list)
+    by_work_dir: Dict[Path, List[RunDetails]] = defaultdict(list)
+    for launch in launches:
+        by_work_dir[launch.work_dir].append(launch)
+    for work_dir, group in by_work_dir.items():
+        index = RunIntervalIndex(group)
+        for task_dir, finished in iter_task_markers(work_dir):
+            if not finished:
+                continue
+            ended = file_mtime(task_dir / ".exitcode")
+            members = index.lookup(ended)
+            if members:
+                launch = _owning_launch([group[member] for member in members], ended)
+                found[id(launch)].append(task_record(launch, task_dir, with_trace=True))
+    return found
+
+
+def _owning_launch(candidates: List[RunDetails], ended: Optional[datetime]) -> RunDetails:
+    """
+    The one launch a task belongs to among those whose padded windows hold its .exitcode
+    mtime: back-to-back -resume launches overlap once padded. Launches whose unpadded window
+    holds it win; among those, the latest one started at or before it.
+    """
+    if ended is None:
+        return candidates[0]
+    inside = [
+        launch
+        for launch in candidates
+        if (launch.started is None or launch.started <= ended) and (launch.ended is None or ended <= launch.ended)
+    ]
+    pool = inside or candidates
+    before = [launch for launch in pool if launch.started is None or launch.started <= ended]
+    if before:
+        return max(before, key=lambda launch: launch.started or datetime.min)
+    return min(pool, key=lambda launch: launch.started or datetime.min)
+
+
+def _cached_from_logs(base: Path, session_id: str) -> Dict[Optional[str], Counter]:
+    """
+    Count 'Cached process' log lines per run name and process across rotated logs.
+    """
+    counts: Dict[Optional[str], Counter] = defaultdict(Counter)
+    paths = [base / ".nextflow.log"] + [base / f".nextflow.log.{number}" for number in range(1, ROTATED_LOGS + 1)]
+    for path in paths:
+        if not path.exists():
+            continue
+        session: Optional[str] = None
+        run_name: Optional[str] = None
+        for line in path.read_text(errors="replace").splitlines():
+            if match := SESSION_RE.search(line):
+                session = match.group(1)
+                run_name = None
+            elif match := RUN_NAME_RE.search(line):
+                run_name = match.group(1)
+            elif session == session_id and (match := CACHED_RE.search(line)):
+                counts[run_name][match.group(1)] += 1
+    return counts
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .models import GrepMatch, RunDetails
+from .utils import iter_run_task_dirs, mapped_bytes, read_process_name, task_hash
+
+LOG = logging.getLogger("nflog")
+
+GREP_FILES = {
+    "err": ".command.err",
+    "log": ".command.log",
+    "out": ".command.out",
+    "sh": ".command.sh",
+    "run": ".command.run",
+}
+DEFAULT_GREP_FILES = ("err", "log", "out", "sh")
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+MAX_LINE_CHARS = 400
+
+
+def grep_run(
+    run: RunDetails,
+    pattern: str,
+    files: Sequence[str] = DEFAULT_GREP_FILES,
+    ignore_case: bool = False,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    workers: Optional[int] = None,
+) -> Iterator[GrepMatch]:
+    """
+    Search the task files of a single run and yield matches as they are found.
+
+    Only task dirs belonging to the run are visited. Files are memory-mapped and searched
+    with a bytes regex in a thread pool; at most ``max_bytes`` of each file are scanned.
+    Matches are yielded in task-scan order, one per matching line.
+    """
+    unknown = [key for key in files if key not in GREP_FILES]
+    if unknown:
+        raise ValueError(f"Unknown task file(s): {', '.join(unknown)}. Choose from {', '.join(GREP_FILES)}.")
+    # MULTILINE so ^ and $ anchor at each line, as in grep.
+    regex = re.compile(pattern.encode(), re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+    names = [GREP_FILES[key] for key in files]
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Bound the number of in-flight tasks so results stream instead of piling up.
+        pending: Deque[Future] = deque()
+        for task_dir in iter_run_task_dirs(run.work_dir, run.started, run.ended):
+            pending.append(pool.submit(_grep_task, run.run_id, task_dir, names, regex, max_bytes))
+            if len(pending) >= workers * 4:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _grep_task(run_id: str, task_dir: Path, names: Iterable[str], regex: re.Pattern, max_bytes: int) -> List[GrepMatch]:
+    matches: List[GrepMatch] = []
+    process_name: Optional[str] = None
+    for name in names:
+        path = task_dir / name
+        hits = _grep_file(path, regex, max_bytes)
+        if hits and process_name is None:
+            process_name = read_process_name(task_dir / ".command.run")
+        for line_number, line in hits:
+            matches.append(
+                GrepMatch(
+                    run_id=run_id,
+                    task_hash=task_hash(task_dir),
+                    process_name=process_name,
+                    path=path,
+                    line_number=line_number,
+                    line=line,
+                )
+            )
+    return matches
+
+
+def _grep_file(path: Path, regex: re.Pattern, max_bytes: int) -> List[Tuple[int, str]]:
+    try:
+        with mapped_bytes(path) as buf:
+            return _scan_lines(buf, regex, min(len(buf), max_bytes))
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as exc:
+        LOG.debug("Failed searching %s: %s", path, exc)
+        return []
+
+
+def _scan_lines(buf: mmap.mmap | bytes, regex: re.Pattern, end: int) -> List[Tuple[int, str]]:
+    hits: List[Tuple[int, str]] = []
+    pos = 0
+    line_number = 1
+    counted_to = 0
+    while pos < end:
+        match = regex.search(buf, pos, end)
+        if match is None:
+            break
+        line_start = buf.rfind(b"\n", 0, match.start()) + 1
+        line_end = buf.find(b"\n", match.start(), end)
+        if line_end == -1:
+            line_end = end
+        if match.end() > line_end and regex.search(buf, line_start, line_end) is None:
+            # Matched across a line break (\s, [^...]); grep only matches within a line.
+            pos = line_end + 1
+            continue
+        line_number += buf[counted_to:line_start].count(b"\n")
+        counted_to = line_start
+        line = buf[line_start:line_end].decode(errors="replace").rstrip("\r")
+        if len(line) > MAX_LINE_CHARS:
+            line = line[:MAX_LINE_CHARS] + "…"
+        hits.append((line_number, line))
+        pos = line_end + 1
+    return hits
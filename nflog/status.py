@@ -1,17 +1,217 @@
 from __future__ import annotations
 
 import logging
+import math
+import random
+import re
+import time
+from bisect import bisect_left
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
-from .models import RunDetails, RunStatus
-from .utils import file_mtime, iter_task_dirs, within_window
+from .cache import session_tasks, task_dir_for
+from .models import CacheEntry, RunDetails, RunStatus
+from .utils import WINDOW_PAD, file_mtime, iter_task_dirs, iter_task_markers, read_int, within_window
 
 LOG = logging.getLogger("nflog")
 
+DEFAULT_SAMPLE = 0.05
+MIN_SAMPLED_PREFIXES = 2
+Z_95 = 1.96
+HEX_PREFIX_RE = re.compile(r"[0-9a-f]{2}")
+
 
 def get_status(run: RunDetails) -> RunStatus:
+    return _run_status(run, session_tasks(run))
+
+
+def _run_status(run: RunDetails, entries: Optional[List[CacheEntry]]) -> RunStatus:
+    """
+    ``get_status`` for callers that already read the run's cache index (None: no index).
+    """
     counts: Dict[str, int] = {"succeeded": 0, "failed": 0, "cached": 0, "running": 0}
+    if entries is not None:
+        considered = _count_cache_entries(run, entries, counts)
+        details_from = "nextflow cache index"
+        if run.status in {"success", "fail"}:
+            return RunStatus(run_id=run.run_id, overall=_overall_status(counts, considered), counts=counts, details_from=details_from)
+    else:
+        considered = _count_exit_codes(run, counts)
+        details_from = "work/.exitcode files"
+    # Running tasks: .command.run exists but .exitcode missing
+    for run_path in run.work_dir.rglob(".command.run"):
+        task_dir = run_path.parent
+        exit_path = task_dir / ".exitcode"
+        if exit_path.exists():
+            continue
+        ts = file_mtime(run_path)
+        if within_window(ts, run.started, run.ended):
+            counts["running"] += 1
+            considered += 1
+    overall = _overall_status(counts, considered)
+    return RunStatus(run_id=run.run_id, overall=overall, counts=counts, details_from=details_from)
+
+
+def get_statuses(runs: List[RunDetails]) -> List[RunStatus]:
+    """
+    Status for several runs, in input order, from a single walk per work dir.
+
+    Runs backed by a Nextflow cache index are counted from it directly. For the rest, each
+    task's marker mtime is looked up in an interval index of the run windows, so a task
+    costs one bisect plus the runs it belongs to instead of one scan per run.
+    """
+    statuses: Dict[int, RunStatus] = {}
+    by_work_dir: Dict[Path, List[int]] = {}
+    for position, run in enumerate(runs):
+        entries = session_tasks(run)
+        if entries is not None:
+            statuses[position] = _run_status(run, entries)
+        else:
+            by_work_dir.setdefault(run.work_dir, []).append(position)
+    for work_dir, positions in by_work_dir.items():
+        index = RunIntervalIndex([runs[position] for position in positions])
+        counts = [{"succeeded": 0, "failed": 0, "cached": 0, "running": 0} for _ in positions]
+        considered = [0] * len(positions)
+        for task_dir, finished in iter_task_markers(work_dir):
+            marker = task_dir / (".exitcode" if finished else ".command.run")
+            members = index.lookup(file_mtime(marker))
+            if not members:
+                continue
+            key = _marker_key(marker, finished)
+            for member in members:
+                considered[member] += 1
+                if key:
+                    counts[member][key] += 1
+        for member, position in enumerate(positions):
+            statuses[position] = RunStatus(
+                run_id=runs[position].run_id,
+                overall=_overall_status(counts[member], considered[member]),
+                counts=counts[member],
+                details_from="work/.exitcode files",
+            )
+    return [statuses[position] for position in range(len(runs))]
+
+
+class RunIntervalIndex:
+    """
+    Stabbing index over run windows (the same padded bounds as ``within_window``).
+
+    All window endpoints are sorted into breakpoints; the runs covering each breakpoint and
+    each open gap between breakpoints are precomputed, so a lookup is a single bisect.
+    """
+
+    def __init__(self, runs: List[RunDetails]) -> None:
+        self._unbounded = [i for i, run in enumerate(runs) if run.started is None and run.ended is None]
+        bounds = []
+        for i, run in enumerate(runs):
+            lo = (run.started - WINDOW_PAD).timestamp() if run.started else -math.inf
+            hi = (run.ended + WINDOW_PAD).timestamp() if run.ended else math.inf
+            bounds.append((lo, hi, i))
+        self._points = sorted({value for lo, hi, _ in bounds for value in (lo, hi) if math.isfinite(value)})
+        # slot 2k+1 is the point _points[k]; slot 2k is the gap just before it.
+        self._slots: List[List[int]] = [[] for _ in range(2 * len(self._points) + 1)]
+        for lo, hi, i in bounds:
+            first = 2 * bisect_left(self._points, lo) + 1 if math.isfinite(lo) else 0
+            last = 2 * bisect_left(self._points, hi) + 1 if math.isfinite(hi) else len(self._slots) - 1
+            for slot in range(first, last + 1):
+                self._slots[slot].append(i)
+
+    def lookup(self, ts: Optional[datetime]) -> List[int]:
+        if ts is None:
+            return self._unbounded
+        value = ts.timestamp()
+        position = bisect_left(self._points, value)
+        if position < len(self._points) and self._points[position] == value:
+            return self._slots[2 * position + 1]
+        return self._slots[2 * position]
+
+
+def estimate_status(
+    run: RunDetails,
+    sample: float = DEFAULT_SAMPLE,
+    budget: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> RunStatus:
+    """
+    Estimate task counts by scanning a random subset of the work dir's hash-prefix dirs.
+
+    Nextflow spreads task dirs uniformly over ``work/00``..``work/ff``, so each prefix is a
+    cluster sample: counts are extrapolated as N * mean and reported with 95% confidence
+    intervals. At least ``sample`` of the prefixes are scanned; with ``budget`` (seconds),
+    further prefixes are scanned until the time is spent, narrowing the intervals. Runs with
+    a Nextflow cache index, or samples that cover every prefix, are counted exactly.
+    """
+    entries = session_tasks(run)
+    if entries is not None:
+        return _run_status(run, entries)
+    keys = ["succeeded", "failed", "cached", "running", "considered"]
+    try:
+        # Only the hash-prefix dirs: work/ also holds conda/, singularity/, stage-* and such.
+        prefixes = sorted(path for path in run.work_dir.iterdir() if HEX_PREFIX_RE.fullmatch(path.name) and path.is_dir())
+    except FileNotFoundError:
+        prefixes = []
+    random.Random(seed).shuffle(prefixes)
+    total = len(prefixes)
+    wanted = min(total, max(MIN_SAMPLED_PREFIXES, math.ceil(sample * total)))
+    started = time.monotonic()
+    samples: List[Dict[str, int]] = []
+    for prefix in prefixes:
+        if len(samples) >= wanted and (budget is None or time.monotonic() - started >= budget):
+            break
+        observed = dict.fromkeys(keys, 0)
+        for task_dir, finished in iter_task_markers(prefix):
+            marker = task_dir / (".exitcode" if finished else ".command.run")
+            if not within_window(file_mtime(marker), run.started, run.ended):
+                continue
+            observed["considered"] += 1
+            key = _marker_key(marker, finished)
+            if key:
+                observed[key] += 1
+        samples.append(observed)
+    scanned = len(samples)
+    estimates = {key: _extrapolate([observed[key] for observed in samples], total) for key in keys}
+    counts = {key: round(estimates[key][0]) for key in keys if key != "considered"}
+    overall = _overall_status(counts, round(estimates["considered"][0]))
+    exact = scanned == total
+    return RunStatus(
+        run_id=run.run_id,
+        overall=overall,
+        counts=counts,
+        details_from=f"work/.exitcode files in {scanned}/{total} prefix dirs",
+        estimated=not exact,
+        intervals=None if exact else {key: estimates[key][1:] for key in counts},
+    )
+
+
+def _extrapolate(values: List[int], population: int) -> Tuple[float, int, int]:
+    """
+    Cluster-sample estimate of a population total with a 95% normal-approximation interval,
+    using the finite population correction. The lower bound never drops below what was seen.
+    """
+    sampled = len(values)
+    if not sampled:
+        return 0.0, 0, 0
+    seen = sum(values)
+    mean = seen / sampled
+    estimate = population * mean
+    if sampled >= population or sampled < 2:
+        return estimate, round(estimate), round(estimate)
+    variance = sum((value - mean) ** 2 for value in values) / (sampled - 1)
+    margin = Z_95 * population * math.sqrt((1 - sampled / population) * variance / sampled)
+    return estimate, max(seen, math.floor(estimate - margin)), math.ceil(estimate + margin)
+
+
+def _marker_key(marker: Path, finished: bool) -> Optional[str]:
+    if not finished:
+        return "running"
+    exit_code = read_int(marker)
+    if exit_code is None:
+        return None
+    return "succeeded" if exit_code == 0 else "failed"
+
+
+def _count_exit_codes(run: RunDetails, counts: Dict[str, int]) -> int:
     considered = 0
     for task_dir in iter_task_dirs(run.work_dir):
         exit_path = task_dir / ".exitcode"
@@ -27,18 +227,27 @@ def get_status(run: RunDetails) -> RunStatus:
             counts["succeeded"] += 1
         else:
             counts["failed"] += 1
-    # Running tasks: .command.run exists but .exitcode missing
-    for run_path in run.work_dir.rglob(".command.run"):
-        task_dir = run_path.parent
-        exit_path = task_dir / ".exitcode"
-        if exit_path.exists():
+    return considered
+
+
+def _count_cache_entries(run: RunDetails, entries: List[CacheEntry], counts: Dict[str, int]) -> int:
+    """
+    Count the tasks Nextflow recorded for this session; only their own task dirs are read.
+    """
+    considered = 0
+    for entry in entries:
+        considered += 1
+        if entry.cached:
+            counts["cached"] += 1
             continue
-        ts = file_mtime(run_path)
-        if within_window(ts, run.started, run.ended):
-            counts["running"] += 1
-            considered += 1
-    overall = _overall_status(counts, considered)
-    return RunStatus(run_id=run.run_id, overall=overall, counts=counts, details_from="work/.exitcode files")
+        exit_code: Optional[int] = read_int(task_dir_for(run.work_dir, entry.task_hash) / ".exitcode")
+        if exit_code is None:
+            continue
+        if exit_code == 0:
+            counts["succeeded"] += 1
+        else:
+            counts["failed"] += 1
+    return considered
 
 
 def _overall_status(counts: Dict[str, int], considered: int) -> str:
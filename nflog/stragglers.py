@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import time
+from bisect import insort
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import MEDIAN_FLOOR_SECONDS, RunDetails, Straggler, TaskRecord
+from .tasks import iter_tasks, task_end
+
+LOG = logging.getLogger("nflog")
+
+DEFAULT_FACTOR = 2.0
+DEFAULT_KEEP = 10
+MIN_TASKS = 5
+
+
+def find_stragglers(
+    run: RunDetails,
+    factor: float = DEFAULT_FACTOR,
+    keep: int = DEFAULT_KEEP,
+    process: Optional[str] = None,
+) -> List[Straggler]:
+    """
+    Report tasks that ran far longer than the rest of their process, longest first.
+
+    Durations come from .command.trace realtime when present, else from the .command.begin
+    mtime to the task's end (``task_end``). A task is a straggler when it is above
+    its process's p95 and at least ``factor`` times its median. Each process keeps two P²
+    quantile estimators and its ``keep`` longest tasks, so memory does not grow with the
+    number of tasks.
+    """
+    records = iter_tasks(run, include_running=True)
+    if process is not None:
+        records = (record for record in records if record.process_name == process)
+    return collect_stragglers(run, records, factor=factor, keep=keep)
+
+
+def collect_stragglers(
+    run: RunDetails,
+    records: Iterable[TaskRecord],
+    factor: float = DEFAULT_FACTOR,
+    keep: int = DEFAULT_KEEP,
+    now: Optional[float] = None,
+) -> List[Straggler]:
+    now = time.time() if now is None else now
+    stats: Dict[str, _ProcessDurations] = {}
+    for record in records:
+        duration = task_duration(record, run, now)
+        if duration is None:
+            continue
+        name = record.process_name or "-"
+        if name not in stats:
+            stats[name] = _ProcessDurations(keep)
+        stats[name].add(duration, record)
+    found: List[Straggler] = []
+    for name, durations in stats.items():
+        if durations.count < MIN_TASKS:
+            continue
+        median = durations.median.value()
+        p95 = durations.p95.value()
+        for duration, _, record in durations.longest():
+            if duration <= p95 or duration < factor * max(median, MEDIAN_FLOOR_SECONDS):
+                continue
+            found.append(
+                Straggler(
+                    run_id=record.run_id,
+                    task_hash=record.task_hash,
+                    process_name=name,
+                    status=record.status,
+                    duration=duration,
+                    median=median,
+                    p95=p95,
+                    process_tasks=durations.count,
+                    work_dir=record.work_dir,
+                )
+            )
+    found.sort(key=lambda item: item.ratio, reverse=True)
+    return found
+
+
+def task_duration(record: TaskRecord, run: RunDetails, now: float) -> Optional[float]:
+    if record.realtime_ms is not None and record.ended is not None:
+        return record.realtime_ms / 1000
+    if record.started is None:
+        return None
+    return max(0.0, task_end(record, run, now) - record.started.timestamp())
+
+
+class _ProcessDurations:
+    def __init__(self, keep: int) -> None:
+        self.count = 0
+        self.median = P2Quantile(0.5)
+        self.p95 = P2Quantile(0.95)
+        self._keep = keep
+        self._heap: List[Tuple[float, int, TaskRecord]] = []
+        self._tiebreak = count()
+
+    def add(self, duration: float, record: TaskRecord) -> None:
+        self.count += 1
+        self.median.add(duration)
+        self.p95.add(duration)
+        item = (duration, next(self._tiebreak), record)
+        if len(self._heap) < self._keep:
+            heapq.heappush(self._heap, item)
+        elif duration > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+
+    def longest(self) -> List[Tuple[float, int, TaskRecord]]:
+        return sorted(self._heap, reverse=True)
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimate in constant memory (Jain & Chlamtac's P² algorithm).
+
+    Five marker heights track the minimum, p/2, p, (1+p)/2 quantiles and the maximum; each
+    observation shifts marker positions and adjusts heights with a piecewise-parabolic fit.
+    """
+
+    def __init__(self, p: float) -> None:
+        self.p = p
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self._desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        heights = self._heights
+        if len(heights) < 5:
+            insort(heights, value)
+            return
+        positions = self._positions
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(index for index in range(1, 5) if value < heights[index]) - 1
+        for index in range(cell + 1, 5):
+            positions[index] += 1
+        for index in range(5):
+            self._desired[index] += self._increments[index]
+        for index in range(1, 4):
+            delta = self._desired[index] - positions[index]
+            if (delta >= 1 and positions[index + 1] - positions[index] > 1) or (
+                delta <= -1 and positions[index - 1] - positions[index] < -1
+            ):
+                step = 1 if delta > 0 else -1
+                candidate = self._parabolic(index, step)
+                if heights[index - 1] < candidate < heights[index + 1]:
+                    heights[index] = candidate
+                else:
+                    heights[index] = self._linear(index, step)
+                positions[index] += step
+
+    def value(self) -> float:
+        heights = self._heights
+        if not heights:
+            return 0.0
+        if self.count > 5:
+            return heights[2]
+        # Too few samples for the markers: interpolate the exact sorted values.
+        rank = self.p * (len(heights) - 1)
+        lower = int(rank)
+        upper = min(lower + 1, len(heights) - 1)
+        return heights[lower] + (heights[upper] - heights[lower]) * (rank - lower)
+
+    def _parabolic(self, index: int, step: int) -> float:
+        q = self._heights
+        n = self._positions
+        return q[index] + step / (n[index + 1] - n[index - 1]) * (
+            (n[index] - n[index - 1] + step) * (q[index + 1] - q[index]) / (n[index + 1] - n[index])
+            + (n[index + 1] - n[index] - step) * (q[index] - q[index - 1]) / (n[index] - n[index - 1])
+        )
+
+    def _linear(self, index: int, step: int) -> float:
+        q = self._heights
+        n = self._positions
+        return q[index] + step * (q[index + step] - q[index]) / (n[index + step] - n[index])
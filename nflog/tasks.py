@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .cache import session_tasks, task_dir_for
+from .models import RunDetails, TaskRecord
+from .utils import file_mtime, iter_run_task_dirs, read_int, read_process_name, read_trace, task_hash, within_window
+
+LOG = logging.getLogger("nflog")
+
+# Files a task keeps writing while it runs; their latest mtime is when it stopped.
+TASK_OUTPUT_FILES = (".command.begin", ".command.log", ".command.err", ".command.out", ".command.trace")
+
+
+def iter_tasks(run: RunDetails, include_running: bool = False, with_trace: bool = True) -> Iterator[TaskRecord]:
+    """
+    Yield one TaskRecord per task dir of the run.
+
+    Start/end times come from the .command.begin and .exitcode mtimes; resource fields are
+    filled from .command.trace when ``with_trace`` is set and the file exists. With
+    ``include_running`` a second pass picks up task dirs that have no .exitcode yet.
+    """
+    for task_dir in iter_run_task_dirs(run.work_dir, run.started, run.ended):
+        yield task_record(run, task_dir, with_trace)
+    if not include_running:
+        return
+    for task_dir in _running_task_dirs(run):
+        yield task_record(run, task_dir, with_trace)
+
+
+def iter_session_tasks(run: RunDetails, include_running: bool = False, with_trace: bool = True) -> Iterator[TaskRecord]:
+    """
+    ``iter_tasks`` with membership taken from the Nextflow cache index when the run has one
+    (see ``session_tasks``), so task dirs whose mtimes fall outside the run window still
+    count. Tasks the launch reused from the cache come with status "cached", as in
+    ``get_status``. The index only lists finished tasks, so with ``include_running`` the
+    running ones of an unfinished run are picked up from the window as in ``iter_tasks``.
+    """
+    entries = session_tasks(run)
+    if entries is None:
+        yield from iter_tasks(run, include_running=include_running, with_trace=with_trace)
+        return
+    indexed = set()
+    for entry in entries:
+        task_dir = task_dir_for(run.work_dir, entry.task_hash)
+        indexed.add(task_dir)
+        if entry.cached:
+            record = task_record(run, task_dir, with_trace)
+            record.status = "cached"
+            yield record
+            continue
+        if not task_dir.exists() or (not include_running and not (task_dir / ".exitcode").exists()):
+            continue
+        yield task_record(run, task_dir, with_trace)
+    if not include_running or run_finished(run):
+        return
+    for task_dir in _running_task_dirs(run):
+        if task_dir not in indexed:
+            yield task_record(run, task_dir, with_trace)
+
+
+def _running_task_dirs(run: RunDetails) -> Iterator[Path]:
+    """
+    Task dirs of the run with a .command.run but no .exitcode yet.
+    """
+    for run_path in run.work_dir.rglob(".command.run"):
+        task_dir = run_path.parent
+        if (task_dir / ".exitcode").exists():
+            continue
+        if within_window(file_mtime(run_path), run.started, run.ended):
+            yield task_dir
+
+
+def task_record(run: RunDetails, task_dir: Path, with_trace: bool) -> TaskRecord:
+    exit_path = task_dir / ".exitcode"
+    ended = file_mtime(exit_path)
+    exit_code = read_int(exit_path) if ended else None
+    err_path = task_dir / ".command.err"
+    record = TaskRecord(
+        run_id=run.run_id,
+        task_hash=task_hash(task_dir),
+        process_name=read_process_name(task_dir / ".command.run"),
+        exit_code=exit_code,
+        status=_task_status(ended is not None, exit_code, run_finished(run)),
+        started=file_mtime(task_dir / ".command.begin"),
+        ended=ended,
+        work_dir=task_dir,
+        err_path=err_path if err_path.exists() else None,
+    )
+    if with_trace:
+        trace = read_trace(task_dir / ".command.trace")
+        record.realtime_ms = _as_int(trace.get("realtime"))
+        record.pct_cpu = trace.get("%cpu")
+        record.peak_rss = _as_int(trace.get("peak_rss"))
+        record.peak_vmem = _as_int(trace.get("peak_vmem"))
+        record.rchar = _as_int(trace.get("rchar"))
+        record.wchar = _as_int(trace.get("wchar"))
+    return record
+
+
+def cpu_hours(record: TaskRecord) -> Optional[float]:
+    """
+    Compute spent by a task: realtime x %cpu from .command.trace (one core when %cpu is missing).
+    """
+    if record.realtime_ms is None:
+        return None
+    cpu_fraction = record.pct_cpu / 100 if record.pct_cpu is not None else 1.0
+    return record.realtime_ms / 1000 * cpu_fraction / 3600
+
+
+def run_finished(run: RunDetails) -> bool:
+    return run.ended is not None or run.status in {"success", "fail"}
+
+
+def task_end(record: TaskRecord, run: RunDetails, now: float) -> float:
+    """
+    When a task stopped, in epoch seconds. A task without .exitcode is only still running
+    while its run is; in a finished run it was killed, so it ends at the last write to its
+    task dir, never after the run's end.
+    """
+    if record.ended is not None:
+        return record.ended.timestamp()
+    if not run_finished(run):
+        return now
+    writes = [ts.timestamp() for ts in (file_mtime(record.work_dir / name) for name in TASK_OUTPUT_FILES) if ts]
+    run_end = run.ended.timestamp() if run.ended else None
+    if not writes:
+        return run_end if run_end is not None else (record.started.timestamp() if record.started else now)
+    return min(max(writes), run_end) if run_end is not None else max(writes)
+
+
+def _task_status(finished: bool, exit_code: Optional[int], run_over: bool = False) -> str:
+    if not finished:
+        # No .exitcode after the run ended: the task was killed without recording one.
+        return "unknown" if run_over else "running"
+    if exit_code is None:
+        return "unknown"
+    if exit_code == 0:
+        return "succeeded"
+    return "failed"
+
+
+def _as_int(value: Optional[float]) -> Optional[int]:
+    return int(value) if value is not None else None
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import logging
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import RunDetails, TaskRecord, Timeline
+from .tasks import iter_tasks, task_end
+
+LOG = logging.getLogger("nflog")
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+Interval = Tuple[float, float, str]
+
+
+def get_timeline(run: RunDetails) -> Timeline:
+    """
+    Build the concurrency profile of a run from task start/end markers.
+
+    A task runs from its .command.begin mtime to its .exitcode mtime; see ``task_end`` for
+    tasks that never wrote one.
+    """
+    return build_timeline(run.run_id, task_intervals(iter_tasks(run, include_running=True, with_trace=False), run))
+
+
+def task_intervals(records: Iterable[TaskRecord], run: RunDetails, now: Optional[float] = None) -> List[Interval]:
+    now = time.time() if now is None else now
+    intervals: List[Interval] = []
+    for record in records:
+        if record.started is None:
+            continue
+        start = record.started.timestamp()
+        end = task_end(record, run, now)
+        intervals.append((start, max(start, end), record.process_name or "-"))
+    return intervals
+
+
+def build_timeline(run_id: str, intervals: List[Interval]) -> Timeline:
+    """
+    Sweep-line over sorted start and end times: O(n log n) for the sort, linear afterwards.
+    """
+    curve = concurrency_curve([i[0] for i in intervals], [i[1] for i in intervals])
+    by_process: Dict[str, List[Interval]] = defaultdict(list)
+    for interval in intervals:
+        by_process[interval[2]].append(interval)
+    span_start = curve[0][0] if curve else None
+    span_end = curve[-1][0] if curve else None
+    span = (span_end - span_start) if curve else 0.0
+    busy_total = sum(end - start for start, end, _ in intervals)
+    processes: Dict[str, dict] = {}
+    for name in sorted(by_process):
+        items = by_process[name]
+        busy = sum(end - start for start, end, _ in items)
+        processes[name] = {
+            "tasks": len(items),
+            "busy_seconds": round(busy, 3),
+            "peak": peak_concurrency([i[0] for i in items], [i[1] for i in items]),
+            "mean": round(busy / span, 3) if span > 0 else 0.0,
+        }
+    return Timeline(
+        run_id=run_id,
+        start=datetime.fromtimestamp(span_start) if span_start is not None else None,
+        end=datetime.fromtimestamp(span_end) if span_end is not None else None,
+        tasks=len(intervals),
+        peak=max((level for _, level in curve), default=0),
+        mean=round(busy_total / span, 3) if span > 0 else 0.0,
+        curve=curve,
+        processes=processes,
+    )
+
+
+def concurrency_curve(starts: List[float], ends: List[float]) -> List[Tuple[float, int]]:
+    """
+    Merge sorted start/end times into (time, level) steps. Ends sort before starts at the
+    same instant so back-to-back tasks do not count as overlapping.
+    """
+    starts = sorted(starts)
+    ends = sorted(ends)
+    curve: List[Tuple[float, int]] = []
+    level = 0
+    i = j = 0
+    n_starts, n_ends = len(starts), len(ends)
+    while i < n_starts or j < n_ends:
+        if j < n_ends and (i >= n_starts or ends[j] <= starts[i]):
+            ts = ends[j]
+            level -= 1
+            j += 1
+        else:
+            ts = starts[i]
+            level += 1
+            i += 1
+        if curve and curve[-1][0] == ts:
+            curve[-1] = (ts, level)
+        else:
+            curve.append((ts, level))
+    return curve
+
+
+def peak_concurrency(starts: List[float], ends: List[float]) -> int:
+    """
+    Highest number of overlapping intervals; the maximum is always reached at a start, where
+    the level is the number of starts so far minus the ends at or before it.
+    """
+    starts = sorted(starts)
+    ends = sorted(ends)
+    return max((index - bisect_right(ends, ts) for index, ts in enumerate(starts, start=1)), default=0)
+
+
+def bin_curve(curve: List[Tuple[float, int]], bins: int) -> List[Tuple[float, float, int]]:
+    """
+    Resample a step curve into ``bins`` equal slices of (bin start, time-weighted mean, max).
+
+    The running integral of the curve is precomputed once, so each bin costs two bisects
+    plus a max over the steps that fall inside it.
+    """
+    if not curve or bins < 1:
+        return []
+    times = [ts for ts, _ in curve]
+    levels = [level for _, level in curve]
+    start, end = times[0], times[-1]
+    width = (end - start) / bins
+    if width <= 0:
+        return [(start, float(levels[0]), levels[0])]
+    area = [0.0]
+    area.extend(accumulate((t1 - t0) * level for t0, t1, level in zip(times, times[1:], levels)))
+
+    def area_at(ts: float) -> Tuple[float, int]:
+        index = bisect_right(times, ts) - 1
+        return area[index] + (ts - times[index]) * levels[index], index
+
+    result: List[Tuple[float, float, int]] = []
+    lo_area, lo_index = area_at(start)
+    for bin_index in range(bins):
+        bin_start = start + bin_index * width
+        hi_area, hi_index = area_at(min(start + (bin_index + 1) * width, end))
+        # Levels in effect during the bin: the one at its start plus every step inside it.
+        top_index = hi_index if times[hi_index] < start + (bin_index + 1) * width else hi_index - 1
+        peak = max(levels[lo_index : max(top_index, lo_index) + 1])
+        result.append((bin_start, (hi_area - lo_area) / width, peak))
+        lo_area, lo_index = hi_area, hi_index
+    return result
+
+
+def sparkline(values: List[float]) -> str:
+    top = max(values, default=0)
+    if top <= 0:
+        return SPARK_CHARS[0] * len(values)
+    scale = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[round(value / top * scale)] for value in values)
@@ -2,62 +2,22 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import mmap
 import os
-import re
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Iterable, Optional
-
-LOG = logging.getLogger("nflog")
-
-
-def parse_history_timestamp(raw: str) -> Optional[datetime]:
-    raw = raw.strip()
-    try:
-        return datetime.strptime(raw, "%Y-%m-%d %H:%M:%S")
-    except ValueError:
-        LOG.debug("Unable to parse history timestamp %s", raw)
-        return None
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional, Tuple
 
+# Kept importable from here; the implementations live in parsing.py.
+from .parsing import parse_duration, parse_history_timestamp, parse_log_timestamp  # noqa: F401
 
-def parse_log_timestamp(raw: str) -> Optional[datetime]:
-    """
-    Parse timestamps like 'Jan-13 16:16:24.765'. Year is assumed to be current year.
-    """
-    parts = raw.split()
-    if not parts:
-        return None
-    raw_ts = parts[0]
-    # raw_ts may contain month-day or month-day.millis; keep the time portion if present
-    try:
-        if len(parts) >= 2:
-            raw_ts = f"{parts[0]} {parts[1]}"
-        return datetime.strptime(f"{datetime.now().year} {raw_ts}", "%Y %b-%d %H:%M:%S.%f")
-    except ValueError:
-        try:
-            return datetime.strptime(f"{datetime.now().year} {raw_ts}", "%Y %b-%d %H:%M:%S")
-        except ValueError:
-            LOG.debug("Unable to parse log timestamp %s", raw)
-            return None
+if TYPE_CHECKING:
+    from .bundle import AnyPath
 
+LOG = logging.getLogger("nflog")
 
-def parse_duration(raw: str) -> Optional[timedelta]:
-    raw = (raw or "").strip()
-    if not raw or raw == "-":
-        return None
-    seconds = 0
-    minute_match = re.search(r"(\d+)m", raw)
-    if minute_match:
-        seconds += int(minute_match.group(1)) * 60
-    second_match = re.search(r"(\d+(?:\.\d+)?)s", raw)
-    if second_match:
-        seconds += float(second_match.group(1))
-    if seconds == 0:
-        try:
-            seconds = float(raw)
-        except ValueError:
-            return None
-    return timedelta(seconds=seconds)
+WINDOW_PAD = timedelta(minutes=5)
 
 
 def map_status(raw: str) -> str:
@@ -77,11 +37,93 @@ def fallback_run_id(base_dir: Path, started: Optional[datetime]) -> str:
     return f"{stamp}-{base}"
 
 
-def iter_task_dirs(work_dir: Path) -> Iterable[Path]:
+def iter_task_dirs(work_dir: AnyPath) -> Iterable[AnyPath]:
     for exit_path in work_dir.rglob(".exitcode"):
         yield exit_path.parent
 
 
+def iter_task_markers(work_dir: AnyPath) -> Iterable[Tuple[AnyPath, bool]]:
+    """
+    Walk the work dir once and yield (task dir, has .exitcode) for every dir holding a
+    .exitcode or .command.run. Task dirs are not descended into.
+    """
+    if not isinstance(work_dir, os.PathLike):
+        # Nothing on disk to walk (see bundle.is_snapshot): look the markers up instead.
+        markers: Dict[AnyPath, bool] = {}
+        for run_path in work_dir.rglob(".command.run"):
+            markers.setdefault(run_path.parent, False)
+        for exit_path in work_dir.rglob(".exitcode"):
+            markers[exit_path.parent] = True
+        yield from markers.items()
+        return
+    for dirpath, dirnames, filenames in os.walk(work_dir):
+        names = set(filenames)
+        if ".exitcode" in names or ".command.run" in names:
+            dirnames[:] = []
+            yield Path(dirpath), ".exitcode" in names
+
+
+def iter_run_task_dirs(work_dir: AnyPath, started: Optional[datetime], ended: Optional[datetime]) -> Iterable[AnyPath]:
+    """
+    Yield task dirs whose .exitcode was written inside the run window.
+    """
+    for task_dir in iter_task_dirs(work_dir):
+        if within_window(file_mtime(task_dir / ".exitcode"), started, ended):
+            yield task_dir
+
+
+def task_hash(task_dir: Path) -> str:
+    """
+    Short task hash as Nextflow prints it, e.g. 'ab/cdef12'.
+    """
+    return f"{task_dir.parent.name}/{task_dir.name[:6]}"
+
+
+def read_process_name(run_path: Path) -> Optional[str]:
+    try:
+        for line in run_path.read_text(errors="replace").splitlines():
+            line = line.strip()
+            if line.startswith("### name:"):
+                # Extract text between quotes if present
+                start = line.find("'")
+                end = line.rfind("'")
+                if start != -1 and end != -1 and end > start:
+                    return line[start + 1 : end]
+                return line.split(":", maxsplit=1)[-1].strip()
+    except FileNotFoundError:
+        return None
+    return None
+
+
+def read_int(path: Path) -> Optional[int]:
+    try:
+        return int(path.read_text().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def read_trace(path: Path) -> Dict[str, float]:
+    """
+    Parse a .command.trace file into numbers. %cpu/%mem are stored in tenths of a percent
+    and memory sizes in KiB; both are normalised (percent and bytes).
+    """
+    values: Dict[str, float] = {}
+    for line in safe_read(path).splitlines():
+        key, sep, raw = line.partition("=")
+        if not sep:
+            continue
+        try:
+            value = float(raw.strip())
+        except ValueError:
+            continue
+        if key in {"%cpu", "%mem"}:
+            value /= 10
+        elif key in {"vmem", "rss", "peak_vmem", "peak_rss"}:
+            value *= 1024
+        values[key] = value
+    return values
+
+
 def file_mtime(path: Path) -> Optional[datetime]:
     try:
         return datetime.fromtimestamp(path.stat().st_mtime)
@@ -92,8 +134,8 @@ def file_mtime(path: Path) -> Optional[datetime]:
 def within_window(ts: Optional[datetime], start: Optional[datetime], end: Optional[datetime]) -> bool:
     if ts is None:
         return start is None and end is None
-    lower_bound = start - timedelta(minutes=5) if start else None
-    upper_bound = end + timedelta(minutes=5) if end else None
+    lower_bound = start - WINDOW_PAD if start else None
+    upper_bound = end + WINDOW_PAD if end else None
     if lower_bound and ts < lower_bound:
         return False
     if upper_bound and ts > upper_bound:
@@ -111,6 +153,23 @@ def tail_text(path: Path, max_lines: int = 20) -> str:
     return "\n".join(lines[-max_lines:])
 
 
+@contextmanager
+def mapped_bytes(path: AnyPath) -> Iterator[bytes | mmap.mmap]:
+    """
+    Read-only bytes view of a file: memory-mapped on disk, read whole otherwise (see
+    bundle.is_snapshot).
+    """
+    if not isinstance(path, os.PathLike):
+        yield path.read_bytes()
+        return
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
+
+
 def safe_read(path: Path) -> str:
     try:
         return path.read_text(errors="replace")
@@ -1,13 +1,34 @@
 from __future__ import annotations
 
+import csv
+import io
 import json
 import os
+import shutil
+import struct
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import pytest
+from click.shell_completion import BashComplete
 from click.testing import CliRunner
-
-from nflog import get_errors, get_run, get_status, list_runs
+from rich.console import Console
+
+from nflog import estimate_status, get_errors, get_run, get_status, get_statuses, list_runs
+from nflog.discovery import run_details
+from nflog.browser import FailureBrowser
+from nflog.bundle import BundleArchive, is_snapshot, open_bundle, write_bundle
+from nflog.completion import completion_cache_path, completion_values
+from nflog.cache import read_leveldb, session_tasks, snappy_decompress
+from nflog.export import export_tasks, tasks_frame
+from nflog.ledger import FailureLedger, error_signature
+from nflog.parsing import parse_duration, parse_history_timestamp, parse_log_timestamp
+from nflog.report import write_report
+from nflog.resume import resume_report
+from nflog.search import grep_run
+from nflog.stragglers import P2Quantile, collect_stragglers, find_stragglers
+from nflog.tasks import iter_tasks
+from nflog.timeline import bin_curve, get_timeline
 from nflog.cli import cli
 
 
@@ -39,6 +60,57 @@ def make_task(base: Path, rel: str, exit_code: int, err_content: str = "", name:
     return task_dir
 
 
+def varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def snappy_literal(data: bytes) -> bytes:
+    out = bytearray(varint(len(data)))
+    for start in range(0, len(data), 256):
+        chunk = data[start : start + 256]
+        out += bytes([60 << 2, len(chunk) - 1]) + chunk
+    return bytes(out)
+
+
+def write_leveldb_log(path: Path, sequence: int, ops: list) -> None:
+    body = bytearray(struct.pack("<QI", sequence, len(ops)))
+    for key, value in ops:
+        if value is None:
+            body += b"\x00" + varint(len(key)) + key
+        else:
+            body += b"\x01" + varint(len(key)) + key + varint(len(value)) + value
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\x00" * 4 + struct.pack("<HB", len(body), 1) + bytes(body))
+
+
+def write_leveldb_table(path: Path, items: list, compress: bool = False) -> None:
+    """Write a single-data-block table of (user_key, sequence, value) sorted by key."""
+
+    def block(entries: list) -> bytes:
+        body = b"".join(varint(0) + varint(len(k)) + varint(len(v)) + k + v for k, v in entries)
+        return body + struct.pack("<II", 0, 1)
+
+    internal = [(key + ((seq << 8) | 1).to_bytes(8, "little"), value) for key, seq, value in items]
+    data = block(internal)
+    payload = snappy_literal(data) if compress else data
+    out = bytearray(payload + bytes([1 if compress else 0]) + b"\x00" * 4)
+    index = block([(internal[-1][0], varint(0) + varint(len(payload)))])
+    index_offset = len(out)
+    out += index + b"\x00" * 5
+    handles = varint(0) + varint(0) + varint(index_offset) + varint(len(index))
+    out += handles + b"\x00" * (40 - len(handles)) + (0xDB4775248B80FB57).to_bytes(8, "little")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(bytes(out))
+
+
 def test_list_runs_from_history(tmp_path: Path) -> None:
     base = tmp_path / "proj"
     ts1 = datetime(2024, 1, 1, 10, 0, 0)
@@ -53,6 +125,64 @@ def test_list_runs_from_history(tmp_path: Path) -> None:
     assert runs[1].status == "success"
 
 
+def test_list_runs_filters_and_pagination(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    for day in range(1, 8):
+        status = "ERR" if day % 2 else "OK"
+        make_history_run(base, datetime(2024, 2, day, 9, 0, 0), "10s", f"run_{day}", status, f"sess-{day}")
+
+    in_range = list_runs(base, since=datetime(2024, 2, 3), until=datetime(2024, 2, 5, 23, 0, 0))
+    assert [r.run_id for r in in_range] == ["sess-5", "sess-4", "sess-3"]
+
+    failed = list_runs(base, status="fail")
+    assert [r.run_id for r in failed] == ["sess-7", "sess-5", "sess-3", "sess-1"]
+
+    page = list_runs(base, status="fail", limit=2, offset=1)
+    assert [r.run_id for r in page] == ["sess-5", "sess-3"]
+
+    named = list_runs(base, name="run_[12]")
+    assert {r.run_id for r in named} == {"sess-1", "sess-2"}
+
+    assert list_runs(base, since=datetime(2024, 3, 1)) == []
+
+
+def test_list_runs_filters_match_the_unfiltered_listing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    base = tmp_path / "proj"
+    make_history_run(base, datetime(2024, 2, 10, 9, 0, 0), "10s", "first", "ERR", "sess-resumed")
+    make_history_run(base, datetime(2024, 2, 11, 9, 0, 0), "10s", "other", "OK", "sess-other")
+    make_history_run(base, datetime(2024, 2, 12, 9, 0, 0), "10s", "second", "OK", "sess-resumed")
+
+    (resumed,) = [r for r in list_runs(base) if r.run_id == "sess-resumed"]
+    assert (resumed.run_name, resumed.status) == ("second", "success")
+    assert list_runs(base, status="fail") == []
+    assert list_runs(base, name="first") == []
+    assert [r.run_id for r in list_runs(base, until=datetime(2024, 2, 11, 12, 0, 0))] == ["sess-other"]
+
+    write_file(base / ".nextflow.log", "Feb-01 08:00:00.000 [main] DEBUG nextflow.Session - Session UUID: sess-log-only\n")
+    touch_with_time(base / ".nextflow.log", datetime(2024, 2, 1, 8, 1, 0))
+
+    def no_log(base_dir: Path) -> list:
+        raise AssertionError("log parsed although history filled the page")
+
+    monkeypatch.setattr("nflog.discovery._from_log", no_log)
+    assert [r.run_id for r in list_runs(base, limit=1)] == ["sess-resumed"]
+
+
+def test_cli_runs_filters(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    make_history_run(base, datetime(2024, 2, 1, 9, 0, 0), "10s", "old", "ERR", "sess-old")
+    make_history_run(base, datetime(2024, 2, 2, 9, 0, 0), "10s", "new", "OK", "sess-new")
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        ["--base-dir", str(base), "runs", "--tsv", "--since", "2024-02-01", "--status", "fail"],
+    )
+    assert result.exit_code == 0
+    lines = result.output.strip().splitlines()
+    assert len(lines) == 2
+    assert "sess-old" in lines[1]
+
+
 def test_get_run_from_log(tmp_path: Path) -> None:
     base = tmp_path / "proj"
     log = (
@@ -215,3 +345,655 @@ def test_failed_tsv_list_and_index(tmp_path: Path) -> None:
     assert "index\tprocess" in list_out.output
     assert "tsv_proc" in list_out.output
     assert "tsv_proc" in index_out.output
+
+
+def test_grep_run_restricts_to_run_tasks(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    old_start = datetime(2024, 1, 11, 8, 0, 0)
+    start = datetime(2024, 1, 12, 8, 0, 0)
+    make_history_run(base, old_start, "10s", "old", "ERR", "sess-grep-old")
+    make_history_run(base, start, "10s", "new", "ERR", "sess-grep")
+    old_task = make_task(base, "aa/0123456789", 1, err_content="OutOfMemoryError\n", name="old_proc")
+    new_task = make_task(base, "bb/abcdef0123", 1, err_content="line one\njava.lang.OutOfMemoryError: heap\n", name="new_proc")
+    touch_with_time(old_task / ".exitcode", old_start + timedelta(seconds=5))
+    touch_with_time(new_task / ".exitcode", start + timedelta(seconds=5))
+
+    run = get_run("sess-grep", base)
+    matches = list(grep_run(run, "outofmemory", ignore_case=True, files=["err"]))
+    assert len(matches) == 1
+    assert matches[0].task_hash == "bb/abcdef"
+    assert matches[0].process_name == "new_proc"
+    assert matches[0].line_number == 2
+    assert "heap" in matches[0].line
+
+    anchored = list(grep_run(run, "^java", files=["err"])) + list(grep_run(run, "one$", files=["err"]))
+    assert [(m.line_number, m.line) for m in anchored] == [(2, "java.lang.OutOfMemoryError: heap"), (1, "line one")]
+    assert list(grep_run(run, r"one\s+java", files=["err"])) == []
+    assert [m.line_number for m in grep_run(run, r"one[^!]*heap|Error:\s+heap", files=["err"])] == [2]
+
+    capped = list(grep_run(run, "OutOfMemory", files=["err"], max_bytes=5))
+    assert capped == []
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--base-dir", str(base), "grep", "OutOfMemory", "--tsv"])
+    assert result.exit_code == 0
+    lines = result.output.strip().splitlines()
+    assert lines[0] == "hash\tprocess\tpath\tline_number\tline"
+    assert len(lines) == 2
+    assert "new_proc" in lines[1]
+
+
+def test_export_tasks_csv_and_frame(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 13, 8, 0, 0)
+    make_history_run(base, start, "60s", "export", "ERR", "sess-export")
+    ok = make_task(base, "aa/1111111111", 0, name="align")
+    bad = make_task(base, "bb/2222222222", 1, err_content="boom", name="call")
+    write_file(ok / ".command.begin", "")
+    write_file(ok / ".command.trace", "nextflow.trace/v2\nrealtime=1500\n%cpu=985\npeak_rss=2048\n")
+    touch_with_time(ok / ".command.begin", start + timedelta(seconds=1))
+    touch_with_time(ok / ".exitcode", start + timedelta(seconds=4))
+    touch_with_time(bad / ".exitcode", start + timedelta(seconds=6))
+
+    run = get_run("sess-export", base)
+    out = tmp_path / "tasks.csv"
+    assert export_tasks(run, out, fmt="csv") == 2
+    with out.open(newline="") as handle:
+        rows = {row["process_name"]: row for row in csv.DictReader(handle)}
+    assert rows["align"]["status"] == "succeeded"
+    assert rows["align"]["realtime_ms"] == "1500"
+    assert rows["align"]["pct_cpu"] == "98.5"
+    assert rows["align"]["peak_rss"] == str(2048 * 1024)
+    assert rows["align"]["started"] == (start + timedelta(seconds=1)).isoformat()
+    assert rows["call"]["exit_code"] == "1"
+    assert rows["call"]["err_path"].endswith(".command.err")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--base-dir", str(base), "export", "--run", "sess-export"])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[0].startswith("task_hash,process_name")
+
+
+def test_tasks_frame_and_parquet(tmp_path: Path) -> None:
+    pytest.importorskip("pandas")
+    pq = pytest.importorskip("pyarrow.parquet")
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 13, 8, 0, 0)
+    make_history_run(base, start, "60s", "export", "ERR", "sess-frame")
+    ok = make_task(base, "aa/1111111111", 0, name="align")
+    bad = make_task(base, "bb/2222222222", 1, name="call")
+    touch_with_time(ok / ".exitcode", start + timedelta(seconds=4))
+    touch_with_time(bad / ".exitcode", start + timedelta(seconds=6))
+
+    run = get_run("sess-frame", base)
+    frame = tasks_frame(run, batch_size=1)
+    assert len(frame) == 2
+    assert set(frame["status"]) == {"succeeded", "failed"}
+    out = tmp_path / "tasks.parquet"
+    assert export_tasks(run, out, fmt="parquet", batch_size=1) == 2
+    assert pq.read_table(out).num_rows == 2
+
+
+def test_timeline_concurrency(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 14, 8, 0, 0)
+    make_history_run(base, start, "120s", "timeline", "OK", "sess-timeline")
+    spans = {"aa/1111111111": (0, 60, "align"), "bb/2222222222": (30, 90, "align"), "cc/3333333333": (60, 120, "call")}
+    for rel, (begin, end, name) in spans.items():
+        task_dir = make_task(base, rel, 0, name=name)
+        write_file(task_dir / ".command.begin", "")
+        touch_with_time(task_dir / ".command.begin", start + timedelta(seconds=begin))
+        touch_with_time(task_dir / ".exitcode", start + timedelta(seconds=end))
+
+    profile = get_timeline(get_run("sess-timeline", base))
+    assert profile.tasks == 3
+    assert profile.peak == 2
+    assert [level for _, level in profile.curve] == [1, 2, 2, 1, 0]
+    assert profile.processes["align"] == {"tasks": 2, "busy_seconds": 120.0, "peak": 2, "mean": 1.0}
+    assert profile.processes["call"]["peak"] == 1
+    assert [round(mean, 3) for _, mean, _ in bin_curve(profile.curve, 4)] == [1.0, 2.0, 2.0, 1.0]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--base-dir", str(base), "timeline", "--bins", "4", "--tsv"])
+    assert result.exit_code == 0
+    assert result.output.strip().splitlines()[0] == "bin_start\tmean_running\tmax_running"
+    table = runner.invoke(cli, ["--base-dir", str(base), "timeline"])
+    assert table.exit_code == 0
+    assert "Peak running: 2" in table.output
+
+
+def test_timeline_clamps_killed_tasks_to_their_last_write(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 14, 9, 0, 0)
+    make_history_run(base, start, "120s", "killed", "ERR", "sess-killed")
+    done = make_task(base, "aa/1111111111", 0, name="align")
+    write_file(done / ".command.begin", "")
+    touch_with_time(done / ".command.begin", start)
+    touch_with_time(done / ".exitcode", start + timedelta(seconds=60))
+    # No .exitcode: killed with the run, last wrote to .command.err at +90s.
+    killed = base / "work" / "bb" / "2222222222"
+    write_file(killed / ".command.run", "### name: 'align'")
+    write_file(killed / ".command.begin", "")
+    write_file(killed / ".command.err", "partial")
+    touch_with_time(killed / ".command.run", start + timedelta(seconds=30))
+    touch_with_time(killed / ".command.begin", start + timedelta(seconds=30))
+    touch_with_time(killed / ".command.err", start + timedelta(seconds=90))
+
+    profile = get_timeline(get_run("sess-killed", base))
+    assert profile.tasks == 2
+    assert profile.end == start + timedelta(seconds=90)
+    assert profile.processes["align"]["busy_seconds"] == 120.0
+
+
+def test_p2_quantile_tracks_sorted_values() -> None:
+    values = [(index * 7919) % 1000 for index in range(5000)]
+    median = P2Quantile(0.5)
+    p95 = P2Quantile(0.95)
+    for value in values:
+        median.add(value)
+        p95.add(value)
+    assert abs(median.value() - 500) < 15
+    assert abs(p95.value() - 950) < 15
+
+
+def test_stragglers_flag_slow_tasks(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 15, 8, 0, 0)
+    make_history_run(base, start, "3600s", "slow", "OK", "sess-slow")
+    durations = [60, 62, 58, 61, 59, 63, 60, 900]
+    for index, seconds in enumerate(durations):
+        task_dir = make_task(base, f"{index:02d}/task{index:04d}", 0, name="align")
+        write_file(task_dir / ".command.begin", "")
+        touch_with_time(task_dir / ".command.begin", start + timedelta(seconds=10))
+        touch_with_time(task_dir / ".exitcode", start + timedelta(seconds=10 + seconds))
+    traced = make_task(base, "ff/traced0000", 0, name="call")
+    write_file(traced / ".command.trace", "nextflow.trace/v2\nrealtime=5000\n")
+    touch_with_time(traced / ".exitcode", start + timedelta(seconds=30))
+
+    found = find_stragglers(get_run("sess-slow", base))
+    assert len(found) == 1
+    assert found[0].process_name == "align"
+    assert found[0].task_hash == "07/task00"
+    assert found[0].duration == 900
+    assert 58 <= found[0].median <= 63
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--base-dir", str(base), "stragglers", "--tsv"])
+    assert result.exit_code == 0
+    lines = result.output.strip().splitlines()
+    assert len(lines) == 2
+    assert lines[1].startswith("align\t07/task00")
+
+
+def test_stragglers_floor_a_zero_median(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 15, 9, 0, 0)
+    make_history_run(base, start, "600s", "instant", "OK", "sess-instant")
+    for index, seconds in enumerate([0, 0, 0, 0, 0, 0, 0, 300]):
+        task_dir = make_task(base, f"{index:02d}/touch{index:04d}", 0, name="touch")
+        write_file(task_dir / ".command.begin", "")
+        touch_with_time(task_dir / ".command.begin", start + timedelta(seconds=10))
+        touch_with_time(task_dir / ".exitcode", start + timedelta(seconds=10 + seconds))
+
+    run = get_run("sess-instant", base)
+    # In this order the P² median of the process stays exactly 0.
+    records = sorted(iter_tasks(run), key=lambda record: record.task_hash)
+    found = collect_stragglers(run, records)
+    assert [(item.task_hash, item.duration, item.median) for item in found] == [("07/touch0", 300.0, 0.0)]
+    assert found[0].ratio == 300.0
+    result = CliRunner().invoke(cli, ["--base-dir", str(base), "stragglers", "--json"])
+    assert result.exit_code == 0
+    assert [item["task_hash"] for item in json.loads(result.output)] == ["07/touch0"]
+
+
+def test_snappy_and_leveldb_reader(tmp_path: Path) -> None:
+    # literal "abc" followed by a 1-byte-offset copy of length 6 that overlaps itself
+    assert snappy_decompress(bytes([9, 2 << 2]) + b"abc" + bytes([(2 << 2) | 1, 3])) == b"abcabcabc"
+
+    db = tmp_path / "db"
+    write_leveldb_table(db / "000005.sst", [(b"a", 1, b"old-a"), (b"b", 2, b"b"), (b"c", 3, b"c")], compress=True)
+    write_leveldb_log(db / "000006.log", 4, [(b"a", b"new-a"), (b"c", None), (b"d", b"d")])
+    assert read_leveldb(db) == {b"a": b"new-a", b"b": b"b", b"d": b"d"}
+
+
+def test_status_and_errors_use_nextflow_cache(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 16, 8, 0, 0)
+    session = "0a1b2c3d-0000-4000-8000-000000000000"
+    make_history_run(base, start, "60s", "happy_turing", "ERR", session)
+    hashes = {name: bytes([index]) * 16 for index, name in enumerate(["cached", "ok", "bad"], start=1)}
+    for name, key in hashes.items():
+        hex_hash = key.hex()
+        task_dir = make_task(base, f"{hex_hash[:2]}/{hex_hash[2:]}", 1 if name == "bad" else 0, err_content=f"{name} err", name=name)
+        # mtimes far outside the run window: the cache, not the window, decides membership
+        touch_with_time(task_dir / ".exitcode", start - timedelta(days=3))
+    stray = make_task(base, "ff/ffffffffffffffffffffffffffffff", 1, name="stray")
+    touch_with_time(stray / ".exitcode", start + timedelta(seconds=5))
+    index = b"".join(key + (b"\x01" if name == "cached" else b"\x00") for name, key in hashes.items())
+    write_file(base / ".nextflow" / "cache" / session / "index.happy_turing", "")
+    (base / ".nextflow" / "cache" / session / "index.happy_turing").write_bytes(index)
+
+    run = get_run(session, base)
+    entries = session_tasks(run)
+    assert [(e.task_hash, e.cached) for e in entries] == [(key.hex(), name == "cached") for name, key in hashes.items()]
+    status = get_status(run)
+    assert status.details_from == "nextflow cache index"
+    assert status.counts == {"succeeded": 1, "failed": 1, "cached": 1, "running": 0}
+    errors = get_errors(run)
+    assert [e.process_name for e in errors] == ["bad"]
+
+    (base / ".nextflow" / "cache" / session / "index.happy_turing").unlink()
+    write_leveldb_table(
+        base / ".nextflow" / "cache" / session / "db" / "000003.sst",
+        [(key, seq, b"trace") for seq, key in enumerate(sorted(hashes.values()), start=1)],
+    )
+    assert {e.task_hash for e in session_tasks(run)} == {key.hex() for key in hashes.values()}
+    assert get_status(run).counts["failed"] == 1
+
+
+def test_statuses_for_many_runs_from_one_scan(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    starts = [datetime(2024, 1, 17, hour, 0, 0) for hour in (8, 10, 12)]
+    for index, start in enumerate(starts):
+        make_history_run(base, start, "60s", f"multi_{index}", "OK", f"sess-multi-{index}")
+    layout = [(0, 0), (0, 1), (1, 0), (2, 1), (2, 1)]
+    for number, (run_index, exit_code) in enumerate(layout):
+        task_dir = make_task(base, f"{number:02d}/task{number:04d}", exit_code)
+        touch_with_time(task_dir / ".exitcode", starts[run_index] + timedelta(seconds=30))
+    running = base / "work" / "99" / "running0000"
+    write_file(running / ".command.run", "### name: 'slow'")
+    touch_with_time(running / ".command.run", starts[2] + timedelta(seconds=10))
+
+    runs = [run_details(summary) for summary in list_runs(base)]
+    statuses = get_statuses(runs)
+    assert [s.run_id for s in statuses] == ["sess-multi-2", "sess-multi-1", "sess-multi-0"]
+    for run, multi in zip(runs, statuses):
+        assert multi.counts == get_status(run).counts
+        assert multi.overall == get_status(run).overall
+    assert statuses[0].counts == {"succeeded": 0, "failed": 2, "cached": 0, "running": 1}
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--base-dir", str(base), "runs", "--with-counts", "--tsv"])
+    assert result.exit_code == 0
+    lines = result.output.strip().splitlines()
+    assert lines[0].endswith("succeeded\tfailed\tcached\trunning")
+    assert lines[3].endswith("\t1\t1\t0\t0")
+
+
+def test_snapshot_bundle_as_base_dir(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    # log timestamps carry no year, so keep history and log in the current one
+    start = datetime(datetime.now().year, 1, 18, 8, 0, 0)
+    make_history_run(base, start - timedelta(days=1), "10s", "other", "OK", "sess-other")
+    make_history_run(base, start, "60s", "bundled", "ERR", "sess-bundle")
+    log = (
+        "Jan-18 08:00:00.000 [main] DEBUG nextflow.cli.Launcher - $> nextflow run main.nf\n"
+        "Jan-18 08:00:00.100 [main] DEBUG nextflow.Session - Session UUID: sess-bundle\n"
+        "Jan-18 08:00:00.200 [main] DEBUG nextflow.Session - Run name: bundled\n"
+        f"Jan-18 08:00:00.300 [main] DEBUG nextflow.Session - Work-dir: {base / 'work'} [ext2/ext3]\n"
+    )
+    write_file(base / ".nextflow.log", log)
+    touch_with_time(base / ".nextflow.log", start + timedelta(seconds=60))
+    ok = make_task(base, "aa/1111111111", 0, name="align")
+    bad = make_task(base, "bb/2222222222", 1, err_content="x" * 5000 + "\nfatal: disk full", name="call")
+    unrelated = make_task(base, "cc/3333333333", 1, name="elsewhere")
+    touch_with_time(ok / ".exitcode", start + timedelta(seconds=10))
+    touch_with_time(bad / ".exitcode", start + timedelta(seconds=20))
+    touch_with_time(unrelated / ".exitcode", start - timedelta(days=1))
+
+    bundle = tmp_path / "run.nflog"
+    stats = write_bundle(get_run("sess-bundle", base), bundle, max_file_bytes=1024)
+    assert stats.tasks == 2
+    assert stats.truncated == 1
+    shutil.rmtree(base)
+
+    root = open_bundle(bundle)
+    runs = list_runs(root)
+    assert [r.run_id for r in runs] == ["sess-bundle"]
+    run = get_run(None, root)
+    assert run.work_dir == root / "work"
+    assert get_status(run).counts == {"succeeded": 1, "failed": 1, "cached": 0, "running": 0}
+    errors = get_errors(run)
+    assert errors[0].process_name == "call"
+    assert errors[0].err_excerpt.endswith("fatal: disk full")
+    assert len(errors[0].err_path.read_bytes()) == 1024
+    assert is_snapshot(root) and not is_snapshot(bundle)
+    with BundleArchive(bundle) as archive:
+        assert archive.run_id == "sess-bundle"
+    with pytest.raises(ValueError):
+        archive.read(".nextflow/history")
+
+    runner = CliRunner()
+    status = runner.invoke(cli, ["--base-dir", str(bundle), "status", "--tsv"])
+    assert status.exit_code == 0
+    assert "failed\t1" in status.output
+    failure = runner.invoke(cli, ["--base-dir", str(bundle), "f", "1"])
+    assert failure.exit_code == 0
+    assert "fatal: disk full" in failure.output
+    grep = runner.invoke(cli, ["--base-dir", str(bundle), "grep", "disk full", "--tsv"])
+    assert grep.exit_code == 0
+    assert "call" in grep.output.strip().splitlines()[1]
+
+
+def test_estimate_status_samples_prefix_dirs(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 19, 8, 0, 0)
+    make_history_run(base, start, "600s", "approx", "ERR", "sess-approx")
+    for prefix in range(40):
+        for number in range(5):
+            task_dir = make_task(base, f"{prefix:02x}/task{number:04d}", 1 if number == 0 else 0)
+            touch_with_time(task_dir / ".exitcode", start + timedelta(seconds=30))
+    for other in ("conda", "singularity", "stage-1a2b3c"):
+        (base / "work" / other).mkdir()
+
+    run = get_run("sess-approx", base)
+    estimate = estimate_status(run, sample=0.25, seed=7)
+    assert estimate.estimated
+    assert "10/40 prefix dirs" in estimate.details_from
+    assert estimate.counts["succeeded"] == 160
+    assert estimate.counts["failed"] == 40
+    assert estimate.intervals["failed"] == (40, 40)
+    assert estimate.overall == "fail"
+
+    full = estimate_status(run, sample=1.0)
+    assert not full.estimated
+    assert full.intervals is None
+    assert full.counts == get_status(run).counts
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--base-dir", str(base), "status", "--approx", "--sample", "0.1", "--seed", "1"])
+    assert result.exit_code == 0
+    assert "(estimated)" in result.output
+    assert "95% CI" in result.output
+    implied = runner.invoke(cli, ["--base-dir", str(base), "status", "--sample", "0.1", "--json"])
+    assert implied.exit_code == 0
+    assert json.loads(implied.output)["estimated"] is True
+    exact = runner.invoke(cli, ["--base-dir", str(base), "status", "--json"])
+    assert json.loads(exact.output)["estimated"] is False
+
+
+def test_resume_report_across_launches(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    session = "0a1b2c3d-0000-4000-8000-00000000fe5e"
+    first, second = datetime(2024, 1, 20, 8, 0, 0), datetime(2024, 1, 20, 10, 0, 0)
+    make_history_run(base, first, "60s", "first_run", "ERR", session)
+    make_history_run(base, second, "60s", "second_run", "OK", session)
+    align_key, call_key = b"\x11" * 16, b"\x22" * 16
+    align = make_task(base, f"11/{align_key.hex()[2:]}", 0, name="ALIGN")
+    write_file(align / ".command.trace", "nextflow.trace/v2\nrealtime=3600000\n%cpu=2000\n")
+    make_task(base, f"22/{call_key.hex()[2:]}", 1, name="CALL")
+    (base / ".nextflow" / "cache" / session).mkdir(parents=True)
+    (base / ".nextflow" / "cache" / session / "index.first_run").write_bytes(align_key + b"\x00" + call_key + b"\x00")
+    # the second launch has no index: tasks come from the window, cached ones from the log
+    rerun = make_task(base, "33/rerun00000", 0, name="CALL")
+    write_file(rerun / ".command.trace", "nextflow.trace/v2\nrealtime=1800000\n%cpu=1000\n")
+    touch_with_time(rerun / ".exitcode", second + timedelta(seconds=30))
+    log = (
+        f"Jan-20 10:00:00.100 [main] DEBUG nextflow.Session - Session UUID: {session}\n"
+        "Jan-20 10:00:00.200 [main] DEBUG nextflow.Session - Run name: second_run\n"
+        "Jan-20 10:00:05.000 [Task submitter] INFO  nextflow.processor.TaskProcessor - [11/111111] Cached process > ALIGN (1)\n"
+    )
+    write_file(base / ".nextflow.log", log)
+
+    report = resume_report(session, base)
+    assert [(s.run_name, s.resumed, s.cached, s.executed, s.failed) for s in report.steps] == [
+        ("first_run", False, 0, 2, 1),
+        ("second_run", True, 1, 1, 0),
+    ]
+    assert report.steps[0].cpu_hours == 2.0
+    assert report.steps[0].untraced == 1
+    assert report.steps[0].source == "nextflow cache index"
+    assert report.reexecuted_cpu_hours == 0.5
+    assert report.processes == {"CALL": {"tasks": 1, "cpu_hours": 0.5}}
+
+    result = CliRunner().invoke(cli, ["--base-dir", str(base), "resume-report", "--run", session, "--tsv"])
+    assert result.exit_code == 0
+    assert "second_run\t" in result.output
+
+
+def test_resume_report_assigns_tasks_to_one_back_to_back_launch(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    session = "0a1b2c3d-0000-4000-8000-00000000b2b0"
+    first, second = datetime(2024, 1, 21, 8, 0, 0), datetime(2024, 1, 21, 8, 3, 0)
+    make_history_run(base, first, "60s", "r1", "ERR", session)
+    make_history_run(base, second, "60s", "r2", "OK", session)
+    # Both padded windows hold these mtimes; each task still belongs to one launch.
+    failed = make_task(base, "aa/failed0000", 1, name="ALIGN")
+    write_file(failed / ".command.trace", "nextflow.trace/v2\nrealtime=3600000\n%cpu=100\n")
+    touch_with_time(failed / ".exitcode", first + timedelta(seconds=50))
+    rerun = make_task(base, "bb/rerun00000", 0, name="ALIGN")
+    touch_with_time(rerun / ".exitcode", second + timedelta(seconds=30))
+
+    report = resume_report(session, base)
+    assert [(s.run_name, s.executed, s.failed) for s in report.steps] == [("r1", 1, 1), ("r2", 1, 0)]
+    assert report.reexecuted_cpu_hours == 0.0
+
+
+def test_failure_browser_pages_lazily_and_filters(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 21, 8, 0, 0)
+    make_history_run(base, start, "600s", "browse", "ERR", "sess-browse")
+    for number in range(30):
+        name, code = ("ALIGN", 1) if number % 3 else ("CALL", 137)
+        task_dir = make_task(base, f"{number:02x}/task{number:04d}", code, err_content=f"boom {number}", name=name)
+        touch_with_time(task_dir / ".exitcode", start + timedelta(seconds=30))
+    run = get_run("sess-browse", base)
+    out = io.StringIO()
+    keys = iter(["j", "\r", "q", "n", "/", *"CALL", "\r", "e", *"137", "\r", "q"])
+    browser = FailureBrowser(run, Console(file=out, width=200), lambda: next(keys), page_size=4)
+
+    assert len(browser.current_page()) == 4
+    assert len(browser.loaded) == 4
+    second = browser.current_page()[1]
+    browser.loop()
+    assert len(browser.loaded) < 30
+    assert f"boom {int(second.task_dir.name[4:])}" in out.getvalue()
+    assert "echo hi" in out.getvalue()
+    assert (browser.process, browser.exit_code) == ("CALL", 137)
+    assert {f.process_name for f in browser.current_page()} == {"CALL"}
+    assert browser._excerpt.cache_info().currsize <= 3
+
+
+def test_completion_values_are_cached_until_history_changes(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    make_history_run(base, datetime(2024, 1, 22, 8, 0, 0), "60s", "tender_curie", "OK", "sess-complete-1")
+    log = (
+        "Jan-22 08:00:00.100 [main] DEBUG nextflow.Session - Session UUID: sess-complete-1\n"
+        "Jan-22 08:00:00.200 [main] DEBUG nextflow.Session - Run name: tender_curie\n"
+        "Jan-22 08:00:05.000 [Task submitter] INFO  nextflow.Session - [ab/123456] Submitted process > ALIGN (1)\n"
+        "Jan-22 08:00:06.000 [Task submitter] INFO  nextflow.Session - [cd/123456] Cached process > QC:FASTQC (2)\n"
+    )
+    write_file(base / ".nextflow.log", log)
+
+    values = completion_values(base)
+    assert ["sess-complete-1", "tender_curie"] in values["runs"]
+    assert values["processes"] == ["ALIGN", "QC:FASTQC"]
+    cache_path = completion_cache_path(base)
+    cached = json.loads(cache_path.read_text())
+    cached["processes"] = ["FROM_CACHE"]
+    cache_path.write_text(json.dumps(cached))
+    assert completion_values(base)["processes"] == ["FROM_CACHE"]
+
+    make_history_run(base, datetime(2024, 1, 22, 9, 0, 0), "60s", "tender_hopper", "OK", "sess-complete-2")
+    assert completion_values(base)["processes"] == ["ALIGN", "QC:FASTQC"]
+    complete = BashComplete(cli, {}, "nflog", "_NFLOG_COMPLETE")
+    items = complete.get_completions(["--base-dir", str(base), "status", "--run"], "sess-complete-")
+    assert sorted((item.value, item.help) for item in items) == [("sess-complete-1", "tender_curie"), ("sess-complete-2", "tender_hopper")]
+    items = complete.get_completions(["--base-dir", str(base), "runs", "--name"], "tender_h")
+    assert [item.value for item in items] == ["tender_hopper"]
+    items = complete.get_completions(["--base-dir", str(base), "stragglers", "--process"], "QC")
+    assert [item.value for item in items] == ["QC:FASTQC"]
+
+
+def test_html_report_embeds_one_scan_as_json(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 23, 8, 0, 0)
+    make_history_run(base, start, "600s", "reported", "ERR", "sess-report")
+    for number in range(6):
+        failed = number == 5
+        task_dir = make_task(base, f"{number:02x}/task{number:04d}", 1 if failed else 0, err_content="</script> oom" if failed else "", name="ALIGN" if number % 2 else "CALL")
+        write_file(task_dir / ".command.trace", "nextflow.trace/v2\nrealtime=60000\n%cpu=1000\npeak_rss=100\n")
+        write_file(task_dir / ".command.begin", "")
+        touch_with_time(task_dir / ".command.begin", start + timedelta(seconds=10 * number))
+        touch_with_time(task_dir / ".exitcode", start + timedelta(seconds=10 * number + 60))
+
+    output = tmp_path / "report.html"
+    stats = write_report(get_run("sess-report", base), output, max_excerpts=1, bins=10)
+    assert (stats.tasks, stats.failures) == (6, 1)
+    page = output.read_text()
+    assert page.count("</script>") == 2
+    data = json.loads(page.split('type="application/json">')[1].split("</script>")[0])
+    assert data["counts"]["failed"] == 1
+    assert data["failures"]["rows"][0][1:] == ["ALIGN", 1, "05/task0005", "</script> oom"]
+    processes = {row[0]: dict(zip(data["processes"]["columns"], row)) for row in data["processes"]["rows"]}
+    assert processes["CALL"]["tasks"] == 3
+    assert processes["CALL"]["median_s"] == 60.0
+    assert processes["ALIGN"]["cpu_hours"] == 0.05
+    assert data["timeline"]["peak"] == 6
+    assert len(data["timeline"]["bins"]) == 10
+
+    result = CliRunner().invoke(cli, ["--base-dir", str(base), "report", "--run", "sess-report", "-o", str(tmp_path / "cli.html")])
+    assert result.exit_code == 0
+    assert (tmp_path / "cli.html").exists()
+
+
+def test_html_report_uses_nextflow_cache_membership(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 23, 9, 0, 0)
+    session = "0a1b2c3d-0000-4000-8000-000000000001"
+    make_history_run(base, start, "600s", "cached_report", "OK", session)
+    hashes = {name: bytes([index]) * 16 for index, name in enumerate(["reused", "ran"], start=1)}
+    for name, key in hashes.items():
+        hex_hash = key.hex()
+        task_dir = make_task(base, f"{hex_hash[:2]}/{hex_hash[2:]}", 0, name=name)
+        # mtimes far outside the run window: the cache, not the window, decides membership
+        touch_with_time(task_dir / ".exitcode", start - timedelta(days=3))
+    stray = make_task(base, "ff/ffffffffffffffffffffffffffffff", 0, name="stray")
+    touch_with_time(stray / ".exitcode", start + timedelta(seconds=5))
+    index = b"".join(key + (b"\x01" if name == "reused" else b"\x00") for name, key in hashes.items())
+    (base / ".nextflow" / "cache" / session).mkdir(parents=True)
+    (base / ".nextflow" / "cache" / session / "index.cached_report").write_bytes(index)
+
+    output = tmp_path / "report.html"
+    run = get_run(session, base)
+    stats = write_report(run, output)
+    data = json.loads(output.read_text().split('type="application/json">')[1].split("</script>")[0])
+    assert stats.tasks == 2
+    assert data["counts"] == {"succeeded": 1, "failed": 0, "cached": 1, "running": 0, "unknown": 0}
+    assert get_status(run).counts["cached"] == data["counts"]["cached"]
+    assert [row[0] for row in data["processes"]["rows"]] == ["ran"]
+
+    # Still running: the index lists finished tasks only, running ones come from the window.
+    live = "0a1b2c3d-0000-4000-8000-000000000002"
+    make_history_run(base, start + timedelta(hours=1), "-", "live_report", "-", live)
+    (base / ".nextflow" / "cache" / live).mkdir(parents=True)
+    (base / ".nextflow" / "cache" / live / "index.live_report").write_bytes(hashes["ran"] + b"\x01")
+    running = base / "work" / "ee" / "eeeeeeeeeeeeeeeeeeeeeeeeeeeeee"
+    write_file(running / ".command.run", "### name: 'busy'")
+    touch_with_time(running / ".command.run", start + timedelta(hours=1, seconds=5))
+    stats = write_report(get_run(live, base), output)
+    data = json.loads(output.read_text().split('type="application/json">')[1].split("</script>")[0])
+    assert (stats.tasks, data["counts"]["cached"], data["counts"]["running"]) == (2, 1, 1)
+
+
+def test_fast_parsers_and_log_year_inference(tmp_path: Path) -> None:
+    assert parse_duration("1d 4h") == timedelta(days=1, hours=4)
+    assert parse_duration("1h 2m 3s") == timedelta(hours=1, minutes=2, seconds=3)
+    assert parse_duration("3.4s") == timedelta(seconds=3.4)
+    assert parse_duration("120ms") == timedelta(milliseconds=120)
+    assert parse_duration("42") == timedelta(seconds=42)
+    assert parse_duration("-") is None
+    assert parse_duration("soon") is None
+    assert parse_history_timestamp("2024-01-13 16:16:24") == datetime(2024, 1, 13, 16, 16, 24)
+    assert parse_history_timestamp("yesterday") is None
+
+    new_year = datetime(2025, 1, 1, 0, 10)
+    line = "Dec-31 23:59:58.250 [main] DEBUG nextflow.Session - Session UUID: sess-ny"
+    assert parse_log_timestamp(line, new_year) == datetime(2024, 12, 31, 23, 59, 58, 250000)
+    assert parse_log_timestamp("Jan-01 00:00:05.000 [main]", new_year) == datetime(2025, 1, 1, 0, 0, 5)
+    assert parse_log_timestamp("Feb-29 10:00:00", datetime(2026, 10, 19)) == datetime(2024, 2, 29, 10, 0)
+    assert parse_log_timestamp("Jan-1 10:00:00", new_year) == datetime(2025, 1, 1, 10, 0)
+    assert parse_log_timestamp("not a timestamp", new_year) is None
+
+    base = tmp_path / "proj"
+    write_file(base / ".nextflow.log", line + "\n" + "Jan-01 00:09:00.000 [main] DEBUG nextflow.Session - done\n")
+    touch_with_time(base / ".nextflow.log", new_year)
+    assert list_runs(base)[0].started == datetime(2024, 12, 31, 23, 59, 58, 250000)
+
+
+def test_failure_ledger_tracks_signatures_across_sessions(tmp_path: Path) -> None:
+    assert error_signature("loading /data/a1/x.bam\nError: read 1234 truncated at 0x7f3a9c21\n") == "Error: read <n> truncated at <hex>"
+    base = tmp_path / "proj"
+    days = [datetime(2024, 1, 24 + offset, 8, 0, 0) for offset in range(3)]
+    for day_index, day in enumerate(days):
+        make_history_run(base, day, "60s", f"ledger_{day_index}", "ERR", f"sess-ledger-{day_index}")
+        err = f"java.lang.OutOfMemoryError: Java heap space in /scratch/job{day_index}/x\n"
+        task_dir = make_task(base, f"{day_index:02x}/oom{day_index:04d}", 1, err_content=err, name="ALIGN")
+        touch_with_time(task_dir / ".exitcode", day + timedelta(seconds=30))
+    fresh = make_task(base, "0a/fresh0000", 2, err_content="KeyError: 'sample'\n", name="CALL")
+    touch_with_time(fresh / ".exitcode", days[2] + timedelta(seconds=30))
+
+    ledger = FailureLedger(base)
+    assert [ledger.record(get_run(f"sess-ledger-{index}", base)) for index in range(3)] == [1, 1, 2]
+    assert ledger.record(get_run("sess-ledger-2", base)) == 0
+    lines = ledger.path.read_text().splitlines()
+    assert len(lines) == 7
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--base-dir", str(base), "failed", "--run", "sess-ledger-2", "--history", "--tsv"])
+    assert result.exit_code == 0
+    rows = {row.split("\t")[1]: row.split("\t") for row in result.output.strip().splitlines()[1:]}
+    assert rows["ALIGN"][4:] == ["sess-ledger-0", "sess-ledger-2", "3", "3", "3"]
+    assert rows["CALL"][4:] == ["sess-ledger-2", "sess-ledger-2", "1", "1", "1"]
+    assert len(ledger.path.read_text().splitlines()) == 7
+    table = runner.invoke(cli, ["--base-dir", str(base), "failed", "--run", "sess-ledger-2", "--history"])
+    assert "new in this session" in table.output
+
+
+def test_failure_ledger_records_resumed_launches(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    session = "sess-ledger-resume"
+    first, second = datetime(2024, 1, 28, 8, 0, 0), datetime(2024, 1, 29, 8, 0, 0)
+    make_history_run(base, first, "60s", "first_launch", "ERR", session)
+    oom = make_task(base, "01/oom0000", 1, err_content="OutOfMemoryError\n", name="ALIGN")
+    touch_with_time(oom / ".exitcode", first + timedelta(seconds=30))
+    runner = CliRunner()
+    # A plain inspection of the finished launch records it in full and marks it complete.
+    assert runner.invoke(cli, ["--base-dir", str(base), "failed", "--run", session]).exit_code == 0
+    ledger = FailureLedger(base)
+    assert len(ledger.path.read_text().splitlines()) == 2
+    assert runner.invoke(cli, ["--base-dir", str(base), "failed", "--run", session, "--history"]).exit_code == 0
+    assert len(ledger.path.read_text().splitlines()) == 2
+
+    # -resume keeps the session id; the finished first launch must not hide the second.
+    make_history_run(base, second, "60s", "second_launch", "ERR", session)
+    call = make_task(base, "02/call0000", 2, err_content="KeyError: 'sample'\n", name="CALL")
+    touch_with_time(call / ".exitcode", second + timedelta(seconds=30))
+    oom_again = make_task(base, "03/oom0001", 1, err_content="OutOfMemoryError\n", name="ALIGN")
+    touch_with_time(oom_again / ".exitcode", second + timedelta(seconds=40))
+    assert ledger.record(get_run(session, base)) == 2
+    result = runner.invoke(cli, ["--base-dir", str(base), "failed", "--run", session, "--history", "--tsv"])
+    rows = {row.split("\t")[1]: row.split("\t") for row in result.output.strip().splitlines()[1:]}
+    assert rows["CALL"][4:] == [session, session, "1", "1", "1"]
+    assert rows["ALIGN"][4:] == [session, session, "1", "2", "2"]
+    table = runner.invoke(cli, ["--base-dir", str(base), "failed", "--run", session, "--history"])
+    assert "1 sessions, 2 launches" in table.output
+
+
+def test_failure_ledger_records_plain_inspections_of_running_runs(tmp_path: Path) -> None:
+    base = tmp_path / "proj"
+    start = datetime(2024, 1, 30, 8, 0, 0)
+    make_history_run(base, start, "-", "still_going", "-", "sess-ledger-live")
+    for number in range(3):
+        task_dir = make_task(base, f"{number:02x}/fail{number:04d}", 1, err_content=f"Error: step {number} failed\n", name="ALIGN")
+        touch_with_time(task_dir / ".exitcode", start + timedelta(seconds=30 + number))
+    runner = CliRunner()
+    assert runner.invoke(cli, ["--base-dir", str(base), "failed", "--run", "sess-ledger-live", "--show", "1"]).exit_code == 0
+    ledger = FailureLedger(base)
+    rows = [json.loads(line) for line in ledger.path.read_text().splitlines()]
+    # Only the shown failure, and no completion marker while the run is going.
+    assert [row.get("complete") for row in rows] == [None]
+    assert not ledger.is_complete(get_run("sess-ledger-live", base))
+    result = runner.invoke(cli, ["--base-dir", str(base), "failed", "--run", "sess-ledger-live", "--history", "--tsv"])
+    assert result.exit_code == 0
+    assert len(ledger.path.read_text().splitlines()) == 3